@@ -0,0 +1,227 @@
+"""FAQ answer store — per-restaurant IDF-weighted word index over RestaurantFAQ, so common questions skip Gemini."""
+import logging
+import math
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+
+from langchain_core.runnables import RunnableConfig
+from sqlalchemy import select
+
+from app.bot.intent_cache import normalize
+from app.bot.uow import bot_session
+from app.config import settings
+from app.models.faq import RestaurantFAQ
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+# Words that don't tell one question from another ("what are your timings" ~ "timings")
+_STOP = {
+    "what", "whats", "when", "where", "which", "who", "how", "is", "are", "was", "the", "a", "an", "of",
+    "to", "in", "on", "at", "for", "do", "does", "you", "your", "u", "ur", "we", "i", "me", "my", "it",
+    "there", "any", "can", "could", "please", "pls", "tell", "about", "here", "this", "have", "has",
+    "will", "would", "with", "guys", "today", "now", "restaurant", "place", "outlet",
+    "kya", "hai", "ka", "ki", "ke", "ko", "mein", "aap", "aapka", "kaha", "kab", "kitne", "bje",
+    "क्या", "है", "का", "की", "के", "में", "आप",
+}
+
+# Typo-level similarity for two words to count as the same ("parkng" ~ "parking" is 0.62)
+WORD_MATCH = 0.6
+
+
+def _singular(word: str) -> str:
+    # cards / card, dogs / dog, timings / timing
+    return word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+
+
+def content_words(text: str) -> list[str]:
+    """The words of a question that say what it is about, in order, without repeats."""
+    return list(dict.fromkeys(_singular(w) for w in normalize(text).split() if w not in _STOP))
+
+
+def _grams(word: str) -> frozenset[str]:
+    padded = f" {word} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def _word_similarity(a: str, a_grams: frozenset[str], b: str, b_grams: frozenset[str]) -> float:
+    if a == b:
+        return 1.0
+    return 2 * len(a_grams & b_grams) / (len(a_grams) + len(b_grams))
+
+
+@dataclass(frozen=True, slots=True)
+class FAQMatch:
+    faq_id: str
+    question: str
+    answer: str
+    score: float
+
+
+@dataclass(frozen=True, slots=True)
+class _Phrasing:
+    faq_id: str
+    branch_id: str | None
+    question: str
+    answer: str
+    words: tuple[str, ...]
+    grams: tuple[frozenset[str], ...]
+
+
+class FAQIndex:
+    """One restaurant's active FAQ entries; each phrasing line of a question is indexed separately.
+
+    Words are weighted by IDF across the restaurant's FAQs, so a word most of them
+    share ("available", "timings" in a timings-heavy list) counts for little. A
+    phrasing is only a candidate if it matches one of the query's rarest words: a
+    word no FAQ mentions ("is *table* available") means the question is about
+    something else, however well the rest of it overlaps.
+    """
+
+    def __init__(self, loaded_at: float):
+        self.loaded_at = loaded_at
+        self._phrasings: list[_Phrasing] = []
+        self._postings: dict[str, list[int]] = {}  # word trigram -> phrasing positions
+        self._df: Counter[str] = Counter()          # word -> FAQ entries using it
+        self._faqs = 0
+
+    def add(self, faq_id: str, branch_id: str | None, question: str, answer: str):
+        vocabulary = set()
+        for line in question.splitlines():
+            words = content_words(line)
+            if not words:
+                continue
+            pos = len(self._phrasings)
+            grams = tuple(_grams(w) for w in words)
+            self._phrasings.append(_Phrasing(faq_id, branch_id, line.strip(), answer, tuple(words), grams))
+            for g in set().union(*grams):
+                self._postings.setdefault(g, []).append(pos)
+            vocabulary.update(words)
+        if vocabulary:
+            self._faqs += 1
+            self._df.update(vocabulary)
+
+    def idf(self, word: str) -> float:
+        """log(1 + N / (1 + df)); highest for words no FAQ uses."""
+        return math.log(1 + self._faqs / (1 + self._df.get(word, 0)))
+
+    def best(self, text: str, branch_id: str | None) -> FAQMatch | None:
+        words = content_words(text)
+        if not words:
+            return None
+        grams = [_grams(w) for w in words]
+        weights = [self.idf(w) for w in words]
+        rarest = [i for i, w in enumerate(weights) if w >= max(weights) - 1e-9]
+        candidates = set()
+        for g in set().union(*grams):
+            candidates.update(self._postings.get(g, ()))
+
+        best = None
+        for pos in candidates:
+            p = self._phrasings[pos]
+            if p.branch_id is not None and p.branch_id != branch_id:
+                continue
+            # sim[i][j]: query word i vs phrasing word j
+            sim = [
+                [_word_similarity(q, q_grams, w, w_grams) for w, w_grams in zip(p.words, p.grams)]
+                for q, q_grams in zip(words, grams)
+            ]
+            if all(max(sim[i]) < WORD_MATCH for i in rarest):
+                continue
+            # IDF-weighted coverage both ways; the query side (what was asked) counts most
+            asked = sum(wt * max(row) for wt, row in zip(weights, sim)) / sum(weights)
+            p_weights = [self.idf(w) for w in p.words]
+            answered = sum(
+                wt * max(row[j] for row in sim) for j, wt in enumerate(p_weights)
+            ) / sum(p_weights)
+            score = 0.7 * asked + 0.3 * answered
+            # Branch-specific answers win ties over restaurant-wide ones
+            rank = (score, p.branch_id is not None)
+            if best is None or rank > best[0]:
+                best = (rank, FAQMatch(p.faq_id, p.question, p.answer, round(score, 4)))
+        return best[1] if best else None
+
+    def __len__(self) -> int:
+        return len(self._phrasings)
+
+
+class FAQStore:
+    """Indexes load lazily per restaurant and live for CHAT_CONTEXT_TTL_SECONDS or until invalidated."""
+
+    def __init__(self, ttl_seconds: float, threshold: float, write_back: bool):
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        self.write_back = write_back
+        self._indexes: dict[str, FAQIndex] = {}
+
+    async def _index(self, restaurant_id: str, config: RunnableConfig | None) -> FAQIndex:
+        index = self._indexes.get(restaurant_id)
+        if index is not None and time.monotonic() - index.loaded_at < self.ttl_seconds:
+            return index
+        async with bot_session(config) as db:
+            result = await db.execute(
+                select(RestaurantFAQ.id, RestaurantFAQ.branch_id, RestaurantFAQ.question, RestaurantFAQ.answer)
+                .where(RestaurantFAQ.restaurant_id == uuid.UUID(restaurant_id), RestaurantFAQ.is_active == True)
+            )
+            rows = result.all()
+        index = FAQIndex(time.monotonic())
+        for faq_id, branch_id, question, answer in rows:
+            index.add(str(faq_id), str(branch_id) if branch_id else None, question, answer)
+        self._indexes[restaurant_id] = index
+        return index
+
+    async def match(
+        self, restaurant_id: str, branch_id: str | None, text: str, config: RunnableConfig | None = None
+    ) -> FAQMatch | None:
+        index = await self._index(str(restaurant_id), config)
+        found = index.best(text, str(branch_id) if branch_id else None)
+        if found is None or found.score < self.threshold:
+            metrics.incr("faq.misses")
+            return None
+        metrics.incr("faq.hits")
+        return found
+
+    async def remember(
+        self, restaurant_id: str, branch_id: str | None, question: str, answer: str, config: RunnableConfig | None = None
+    ):
+        """Write a Gemini answer back as a branch-scoped entry (when FAQ_WRITE_BACK is on)."""
+        if not self.write_back or not content_words(question):
+            return
+        async with bot_session(config) as db:
+            faq = RestaurantFAQ(
+                restaurant_id=uuid.UUID(restaurant_id),
+                branch_id=uuid.UUID(branch_id) if branch_id else None,
+                question=question.strip(),
+                answer=answer,
+                source="llm",
+            )
+            db.add(faq)
+            await db.commit()
+        index = self._indexes.get(str(restaurant_id))
+        if index is not None:
+            index.add(str(faq.id), branch_id, faq.question, answer)
+        metrics.incr("faq.written_back")
+
+    def invalidate(self, restaurant_id: str | uuid.UUID):
+        self._indexes.pop(str(restaurant_id), None)
+
+    def clear(self):
+        self._indexes.clear()
+
+    def stats(self) -> dict:
+        hits, misses = metrics.counter("faq.hits"), metrics.counter("faq.misses")
+        return {
+            "restaurants": len(self._indexes),
+            "phrasings": sum(len(i) for i in self._indexes.values()),
+            "write_back": self.write_back,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+        }
+
+
+faq_store = FAQStore(
+    ttl_seconds=settings.CHAT_CONTEXT_TTL_SECONDS,
+    threshold=settings.FAQ_MATCH_THRESHOLD,
+    write_back=settings.FAQ_WRITE_BACK,
+)
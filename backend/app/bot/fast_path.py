@@ -0,0 +1,60 @@
+"""Fast path — button / list replies dispatched straight to their action node, without LangGraph.
+
+The steps are the same ones the graph would take for an interactive ID
+(ingest → resolve_session → action → response_formatter); only the
+StateGraph machinery, the per-step state copies and detect_language are skipped.
+Free-text messages always go through the full graph.
+"""
+import inspect
+
+from langchain_core.runnables import RunnableConfig
+
+from app.bot import interactive
+from app.bot.graph import NODES, route_after_intent, timed_nodes
+from app.bot.payload import InboundMessage
+from app.bot.state import BotState
+from app.services import metrics
+
+
+class FastPath:
+    def __init__(self, nodes: dict):
+        self.nodes = timed_nodes(nodes)
+        # Like LangGraph, only pass `config` to nodes that declare it
+        self._takes_config = {name: "config" in inspect.signature(fn).parameters for name, fn in nodes.items()}
+
+    def route(self, inbound: InboundMessage) -> tuple[str, dict | None] | None:
+        """(intent, entities) if this message can skip the graph, else None."""
+        if not inbound.text:
+            return None
+        return interactive.match(inbound.text)
+
+    async def _step(self, name: str, state: BotState, config: RunnableConfig | None):
+        fn = self.nodes[name]
+        out = await (fn(state, config) if self._takes_config[name] else fn(state))
+        if out is not None and out is not state:
+            state.update(out)
+
+    async def run(
+        self,
+        state: BotState,
+        route: tuple[str, dict | None],
+        config: RunnableConfig | None = None,
+    ) -> BotState:
+        metrics.incr("bot.fast_path")
+        state = BotState(**state)  # a copy: the caller's dict is left as it was
+        await self._step("ingest_webhook", state, config)
+        await self._step("resolve_session", state, config)
+
+        if not state.get("error"):
+            state["intent"], entities = route
+            if entities is not None:
+                state["entities"] = entities
+            action = route_after_intent(state)
+            if action != "response_formatter":
+                await self._step(action, state, config)
+
+        await self._step("response_formatter", state, config)
+        return state
+
+
+fast_path = FastPath(NODES)
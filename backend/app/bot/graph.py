@@ -1,5 +1,6 @@
 """LangGraph StateGraph — wires all bot nodes together."""
 from langgraph.graph import StateGraph, END
+from langgraph.graph.state import CompiledStateGraph
 from app.bot.state import BotState
 from app.bot.nodes.ingest_and_session import ingest_webhook, resolve_session
 from app.bot.nodes.intent import detect_language, intent_router
@@ -8,6 +9,23 @@ from app.bot.nodes.cart_and_order import cart_executor, checkout_guard_node, kit
 from app.bot.nodes.billing import bill_generator
 from app.bot.nodes.chat import restaurant_chat
 from app.bot.nodes.menu_and_format import item_info_node
+from app.bot.tracing import timed_node
+
+
+NODES = {
+    "ingest_webhook": ingest_webhook,
+    "resolve_session": resolve_session,
+    "detect_language": detect_language,
+    "intent_router": intent_router,
+    "menu_retrieval": menu_retrieval,
+    "item_info": item_info_node,
+    "cart_executor": cart_executor,
+    "checkout_guard": checkout_guard_node,
+    "kitchen_dispatch": kitchen_dispatch,
+    "bill_generator": bill_generator,
+    "restaurant_chat": restaurant_chat,
+    "response_formatter": response_formatter,
+}
 
 
 def route_after_intent(state: BotState) -> str:
@@ -50,22 +68,18 @@ def route_after_session(state: BotState) -> str:
     return "detect_language"
 
 
-def build_graph() -> StateGraph:
+def timed_nodes(nodes: dict) -> dict:
+    """Wrap every node so it feeds the per-node latency histograms and the message trace."""
+    return {name: timed_node(name, fn) for name, fn in nodes.items()}
+
+
+def build_graph(nodes: dict | None = None) -> CompiledStateGraph:
+    """Compile the bot graph. `nodes` overrides NODES (benchmarks, simulations)."""
     g = StateGraph(BotState)
 
     # Register all nodes
-    g.add_node("ingest_webhook", ingest_webhook)
-    g.add_node("resolve_session", resolve_session)
-    g.add_node("detect_language", detect_language)
-    g.add_node("intent_router", intent_router)
-    g.add_node("menu_retrieval", menu_retrieval)
-    g.add_node("item_info", item_info_node)
-    g.add_node("cart_executor", cart_executor)
-    g.add_node("checkout_guard", checkout_guard_node)
-    g.add_node("kitchen_dispatch", kitchen_dispatch)
-    g.add_node("bill_generator", bill_generator)
-    g.add_node("restaurant_chat", restaurant_chat)
-    g.add_node("response_formatter", response_formatter)
+    for name, fn in timed_nodes(nodes or NODES).items():
+        g.add_node(name, fn)
 
     # Entry point
     g.set_entry_point("ingest_webhook")
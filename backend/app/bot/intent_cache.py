@@ -0,0 +1,134 @@
+"""Intent cache — normalised message text → (intent, entities) resolved by Gemini, scoped per branch."""
+import hashlib
+import logging
+import time
+import unicodedata
+from collections import OrderedDict
+
+import orjson
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.services import metrics
+from app.services.redis_client import get_redis, mark_down
+
+logger = logging.getLogger(__name__)
+
+_DROP = dict.fromkeys(map(ord, "\u200b\u200c\u200d\u2060\ufeff"))  # ZWSP, ZWNJ, ZWJ, WJ, BOM
+_DROP.update(dict.fromkeys(map(ord, "'\u2019")))             # what's == whats
+_DEVANAGARI = {
+    ord("\u093c"): None,      # nukta: क़ → क, ज़ → ज, फ़ → फ
+    ord("\u0901"): "\u0902",  # chandrabindu → anusvara
+    ord("\u0964"): " ",       # danda
+    ord("\u0965"): " ",       # double danda
+}
+
+
+def normalize(text: str) -> str:
+    """Fold the spelling differences that don't change intent.
+
+    NFKC (full-width / compatibility forms; also splits precomposed nukta letters),
+    casefold, zero-width joiners and apostrophes removed, Devanagari nukta / chandrabindu folded,
+    punctuation and symbols turned into spaces, whitespace collapsed.
+    """
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = text.translate(_DROP).translate(_DEVANAGARI)
+    out = []
+    for ch in text:
+        cat = unicodedata.category(ch)
+        out.append(" " if cat[0] in "PSZC" else ch)
+    return " ".join("".join(out).split())
+
+
+class IntentCache:
+    """In-process LRU with a TTL, in front of an optional Redis tier shared by all workers."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float, use_redis: bool):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.use_redis = use_redis
+        self._entries: OrderedDict[str, tuple[str, dict, float]] = OrderedDict()  # key -> (intent, entities, stored_at)
+
+    @staticmethod
+    def _key(branch_id: str | None, text: str) -> str | None:
+        norm = normalize(text)
+        if not norm:
+            return None
+        return f"{branch_id or '-'}:{norm}"
+
+    @staticmethod
+    def _redis_key(key: str) -> str:
+        return "hd:intent:" + hashlib.sha1(key.encode()).hexdigest()
+
+    def peek(self, branch_id: str | None, text: str) -> tuple[str, dict] | None:
+        """Local tier only, and not counted as a hit or miss."""
+        key = self._key(branch_id, text)
+        entry = self._entries.get(key) if key is not None else None
+        if entry is None or time.monotonic() - entry[2] >= self.ttl_seconds:
+            return None
+        return entry[0], dict(entry[1])
+
+    async def get(self, branch_id: str | None, text: str) -> tuple[str, dict] | None:
+        key = self._key(branch_id, text)
+        if key is None:
+            return None
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[2] < self.ttl_seconds:
+            self._entries.move_to_end(key)
+            metrics.incr("intent_cache.hits")
+            return entry[0], dict(entry[1])
+
+        if self.use_redis and (r := get_redis()) is not None:
+            try:
+                raw = await r.get(self._redis_key(key))
+            except RedisError as e:
+                mark_down(e)
+                raw = None
+            if raw is not None:
+                data = orjson.loads(raw)
+                self._store(key, data["intent"], data["entities"])
+                metrics.incr("intent_cache.hits")
+                metrics.incr("intent_cache.redis_hits")
+                return data["intent"], dict(data["entities"])
+
+        metrics.incr("intent_cache.misses")
+        return None
+
+    async def put(self, branch_id: str | None, text: str, intent: str, entities: dict):
+        key = self._key(branch_id, text)
+        if key is None:
+            return
+        self._store(key, intent, entities)
+        if self.use_redis and (r := get_redis()) is not None:
+            try:
+                await r.set(
+                    self._redis_key(key),
+                    orjson.dumps({"intent": intent, "entities": entities or {}}),
+                    ex=int(self.ttl_seconds),
+                )
+            except RedisError as e:
+                mark_down(e)
+
+    def _store(self, key: str, intent: str, entities: dict):
+        self._entries[key] = (intent, dict(entities or {}), time.monotonic())
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        hits, misses = metrics.counter("intent_cache.hits"), metrics.counter("intent_cache.misses")
+        return {
+            "entries": len(self._entries),
+            "redis": self.use_redis,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+        }
+
+
+intent_cache = IntentCache(
+    max_entries=settings.INTENT_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.INTENT_CACHE_TTL_SECONDS,
+    use_redis=settings.INTENT_CACHE_REDIS,
+)
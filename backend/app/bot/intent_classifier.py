@@ -0,0 +1,215 @@
+"""Local intent classifier — character n-gram features + multinomial logistic regression, pure Python.
+
+Trained offline (train_intent_model.py) from a labelled JSONL corpus and the
+`intent.label` lines intent_router logs for Gemini-resolved messages. At run
+time a prediction is a few dict lookups and one softmax, well under a millisecond.
+"""
+import logging
+import math
+import os
+import random
+import re
+from collections import Counter
+
+import orjson
+
+from app.bot.intent_cache import normalize
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(__file__), "data", "intent_model.json")
+
+# Intents the classifier may answer; everything else (QR_SCAN, PLACE_ORDER, ITEM_INFO) comes from IDs
+INTENTS = ("ADD_ITEM", "REMOVE_ITEM", "UPDATE_QTY", "BROWSE", "CART_VIEW", "CONFIRM_SUMMARY", "BILL", "OTHER")
+
+
+def features(text: str, n_min: int = 2, n_max: int = 4) -> set[str]:
+    """Word unigrams plus character n-grams of each padded word (robust to typos and Hinglish spellings)."""
+    feats = set()
+    for word in normalize(text).split():
+        feats.add("w:" + word)
+        padded = f" {word} "
+        for n in range(n_min, n_max + 1):
+            for i in range(len(padded) - n + 1):
+                feats.add(padded[i:i + n])
+    return feats
+
+
+class IntentClassifier:
+    def __init__(self, labels: list[str], weights: dict[str, list[float]], bias: list[float]):
+        self.labels = labels
+        self.weights = weights  # feature -> one weight per label
+        self.bias = bias
+
+    def scores(self, text: str) -> list[float]:
+        z = list(self.bias)
+        for f in features(text):
+            w = self.weights.get(f)
+            if w is not None:
+                for k in range(len(z)):
+                    z[k] += w[k]
+        top = max(z)
+        exp = [math.exp(v - top) for v in z]
+        total = sum(exp)
+        return [e / total for e in exp]
+
+    def predict(self, text: str) -> tuple[str, float]:
+        """(intent, probability) of the most likely label."""
+        probs = self.scores(text)
+        best = max(range(len(probs)), key=probs.__getitem__)
+        return self.labels[best], probs[best]
+
+    # ─── Training / persistence ─────────────────────────────────
+
+    @classmethod
+    def train(
+        cls,
+        samples: list[tuple[str, str]],
+        epochs: int = 20,
+        lr: float = 0.1,
+        l2: float = 1e-3,
+        min_count: int = 1,
+        seed: int = 13,
+    ) -> "IntentClassifier":
+        """SGD on the softmax cross-entropy, class-balanced so rare intents aren't drowned out."""
+        labels = sorted({label for _, label in samples})
+        index = {label: k for k, label in enumerate(labels)}
+        counts = Counter(label for _, label in samples)
+        class_weight = {label: len(samples) / (len(labels) * c) for label, c in counts.items()}
+
+        data = [(features(text), index[label], class_weight[label]) for text, label in samples]
+        df = Counter(f for feats, _, _ in data for f in feats)
+        keep = {f for f, c in df.items() if c >= min_count}
+
+        weights: dict[str, list[float]] = {f: [0.0] * len(labels) for f in keep}
+        bias = [0.0] * len(labels)
+        model = cls(labels, weights, bias)
+        rng = random.Random(seed)
+
+        for epoch in range(epochs):
+            rng.shuffle(data)
+            step = lr / (1 + epoch * 0.1)
+            for feats, y, cw in data:
+                feats = [f for f in feats if f in keep]
+                z = list(bias)
+                for f in feats:
+                    w = weights[f]
+                    for k in range(len(z)):
+                        z[k] += w[k]
+                top = max(z)
+                exp = [math.exp(v - top) for v in z]
+                total = sum(exp)
+                for k in range(len(z)):
+                    grad = (exp[k] / total - (1.0 if k == y else 0.0)) * cw
+                    if grad == 0.0:
+                        continue
+                    bias[k] -= step * grad
+                    for f in feats:
+                        w = weights[f]
+                        w[k] -= step * (grad + l2 * w[k])
+        return model
+
+    def to_dict(self, precision: int = 4, prune: float = 1e-3) -> dict:
+        weights = {
+            f: [round(v, precision) for v in w]
+            for f, w in self.weights.items()
+            if max(abs(v) for v in w) >= prune
+        }
+        return {"labels": self.labels, "bias": [round(b, precision) for b in self.bias], "weights": weights}
+
+    def save(self, path: str = DEFAULT_MODEL_PATH):
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(self.to_dict()))
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_MODEL_PATH) -> "IntentClassifier":
+        with open(path, "rb") as f:
+            data = orjson.loads(f.read())
+        return cls(data["labels"], data["weights"], data["bias"])
+
+
+def load_samples(paths: list[str]) -> list[tuple[str, str]]:
+    """(text, intent) pairs from JSONL corpora and/or log files with `intent.label {...}` lines."""
+    samples = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                marker = line.find("intent.label ")
+                raw = line[marker + len("intent.label "):] if marker >= 0 else line
+                raw = raw.strip()
+                if not raw.startswith("{"):
+                    continue
+                try:
+                    row = orjson.loads(raw)
+                except orjson.JSONDecodeError:
+                    continue
+                if row.get("text") and row.get("intent") in INTENTS:
+                    samples.append((row["text"], row["intent"]))
+    return samples
+
+
+# ─── Entities for classifier-resolved intents ───────────────────
+
+_NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "ek": 1, "do": 2, "teen": 3, "char": 4, "paanch": 5,
+    "एक": 1, "दो": 2, "तीन": 3, "चार": 4, "पांच": 5,
+}
+_NOTE_RE = re.compile(r"\b((?:less|no|extra|without|more|not)\s+\w+|jain)\b")
+_VEG_FALSE = ("non veg", "nonveg", "chicken", "mutton", "fish", "meat", "egg", "मांसाहारी")
+_VEG_TRUE = ("veg", "vegetarian", "शाकाहारी")
+# Words that carry the intent rather than the item name
+_FILLER = {
+    "add", "i", "want", "need", "get", "me", "give", "can", "have", "please", "pls", "bring", "order",
+    "ill", "id", "like", "more", "to", "my", "the", "a", "an", "some", "plate", "plates",
+    "remove", "delete", "cancel", "dont", "anymore", "take", "out", "drop", "from", "cart", "it",
+    "change", "make", "update", "set", "quantity", "qty", "of", "instead", "only", "reduce", "increase",
+    "chahiye", "dedo", "de", "do", "dena", "dijiye", "lao", "mujhe", "hatao", "hata", "nahi", "karo", "kar", "ki", "se",
+    "चाहिए", "दे", "दो", "मुझे", "हटाओ", "नहीं", "कर", "जोड़ो", "जोडो",
+}
+
+
+def extract_entities(intent: str, text: str) -> dict | None:
+    """Entities intent_router would otherwise get from Gemini; None if they can't be read reliably."""
+    norm = normalize(text)
+    if intent == "BROWSE":
+        padded = f" {norm} "
+        if any(f" {w} " in padded for w in _VEG_FALSE):
+            return {"is_veg": False}
+        if any(f" {w} " in padded for w in _VEG_TRUE):
+            return {"is_veg": True}
+        return {}
+    if intent not in ("ADD_ITEM", "REMOVE_ITEM", "UPDATE_QTY"):
+        return {}
+
+    entities: dict = {}
+    note = _NOTE_RE.search(norm)
+    if note:
+        entities["notes"] = note.group(1)
+        norm = (norm[:note.start()] + norm[note.end():]).strip()
+
+    words = []
+    prev = ""
+    for word in norm.split():
+        if word.isdigit() and "quantity" not in entities:
+            entities["quantity"] = int(word)
+        elif word in _NUMBER_WORDS and "quantity" not in entities and not words and prev not in ("de", "दे"):
+            # Only before the item: "do naan" is 2 naan, "naan de do" is "give naan"
+            entities["quantity"] = _NUMBER_WORDS[word]
+        elif word not in _FILLER:
+            words.append(word)
+        prev = word
+    if not words:
+        return None
+    entities["item_name"] = " ".join(words)
+    return entities
+
+
+def load_default() -> IntentClassifier | None:
+    try:
+        return IntentClassifier.load()
+    except FileNotFoundError:
+        logger.warning(f"No intent model at {DEFAULT_MODEL_PATH} — using keyword shortcuts")
+    except Exception:
+        logger.exception("Failed to load intent model — using keyword shortcuts")
+    return None
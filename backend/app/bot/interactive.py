@@ -0,0 +1,50 @@
+"""Interactive reply IDs — the button / list payload IDs our own messages send, mapped to intents."""
+
+# Exact payload IDs → intent
+EXACT_IDS = {
+    "do_confirm": "PLACE_ORDER",        # Kitchen!
+    "confirm_order": "CONFIRM_SUMMARY",  # Preview
+    "view_cart": "CART_VIEW",
+    "edit_cart": "CART_VIEW",
+    "show_menu": "BROWSE",
+}
+
+
+def _qty(rest: str):
+    # qty_2_<uuid> → add 2 portions of the item
+    count, _, item_id = rest.partition("_")
+    if not count.isdigit() or not item_id:
+        return None
+    return "ADD_ITEM", {"item_id": item_id.split("_")[0], "quantity": int(count)}
+
+
+def _item(rest: str):
+    # Item selection from menu → show item info / qty buttons
+    return "ITEM_INFO", {"item_id": rest}
+
+
+def _category(rest: str):
+    return "BROWSE", {"category_id": rest}
+
+
+# Prefixed payload IDs → parser returning (intent, entities) or None
+PREFIX_IDS = (
+    ("qty_", _qty),
+    ("item_", _item),
+    ("cat_", _category),
+)
+
+
+def match(text: str) -> tuple[str, dict | None] | None:
+    """(intent, entities) for an interactive payload ID, or None for anything else.
+
+    `entities` is None for exact IDs — the caller leaves state["entities"] untouched.
+    """
+    lower = text.lower().strip()
+    intent = EXACT_IDS.get(lower)
+    if intent is not None:
+        return intent, None
+    for prefix, parse in PREFIX_IDS:
+        if lower.startswith(prefix):
+            return parse(lower[len(prefix):])
+    return None
@@ -0,0 +1,190 @@
+"""LLM gateway — every Gemini call goes through here: concurrency caps, deadlines, circuit breaker, single-flight, metrics."""
+import asyncio
+import hashlib
+import logging
+import time
+
+from app.config import settings
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class LLMUnavailable(Exception):
+    """The LLM could not answer in time (timeout, error or open breaker) — use the rule-based fallback."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class CircuitBreaker:
+    """Opens after `failures` consecutive failures; after `cooldown` one probe call is let through."""
+
+    def __init__(self, failures: int, cooldown_seconds: float):
+        self.failures = failures
+        self.cooldown = cooldown_seconds
+        self.consecutive = 0
+        self.opened_at: float | None = None
+        self.probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self.probing:
+            self.probing = True
+            return True
+        return False
+
+    def record_success(self):
+        if self.opened_at is not None:
+            logger.info("LLM circuit closed")
+        self.consecutive = 0
+        self.opened_at = None
+        self.probing = False
+
+    def record_failure(self):
+        self.consecutive += 1
+        if self.probing or (self.opened_at is None and self.consecutive >= self.failures):
+            if self.opened_at is None:
+                logger.warning(f"LLM circuit opened after {self.consecutive} consecutive failures")
+            self.opened_at = time.monotonic()
+        self.probing = False
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class LLMGateway:
+    def __init__(self, max_concurrency: int, per_restaurant: int, breaker: CircuitBreaker, single_flight: bool = True):
+        self._global = asyncio.Semaphore(max_concurrency)
+        self._per_restaurant_limit = per_restaurant
+        self._per_restaurant: dict[str, asyncio.Semaphore] = {}
+        self.breaker = breaker
+        self.in_flight = 0
+        self.single_flight = single_flight
+        self._pending: dict[str, _Flight] = {}  # prompt hash -> the call identical prompts share
+
+    def _restaurant_slot(self, restaurant_id: str | None) -> asyncio.Semaphore:
+        key = restaurant_id or "-"
+        sem = self._per_restaurant.get(key)
+        if sem is None:
+            sem = self._per_restaurant[key] = asyncio.Semaphore(self._per_restaurant_limit)
+        return sem
+
+    @staticmethod
+    def prompt_key(llm, messages: list, purpose: str) -> str:
+        h = hashlib.sha1(f"{purpose}\x00{getattr(llm, 'model', '')}".encode())
+        for m in messages:
+            h.update(b"\x00")
+            h.update(f"{getattr(m, 'type', '')}:{getattr(m, 'content', m)}".encode())
+        return h.hexdigest()
+
+    async def invoke(self, llm, messages: list, *, purpose: str, restaurant_id: str | None, timeout: float):
+        """`llm.ainvoke(messages)` within `timeout` seconds (queueing included), or LLMUnavailable.
+
+        Identical prompts already in flight are not sent again: the caller waits (at
+        most `timeout`) for the pending call and shares its response or failure.
+        """
+        if not self.single_flight:
+            return await self._call(llm, messages, purpose, restaurant_id, timeout)
+
+        key = self.prompt_key(llm, messages, purpose)
+        flight = self._pending.get(key)
+        leader = flight is None
+        if leader:
+            flight = self._pending[key] = _Flight(asyncio.create_task(self._call(llm, messages, purpose, restaurant_id, timeout)))
+            flight.task.add_done_callback(lambda t: self._settle(key, t))
+        else:
+            metrics.incr(f"llm.{purpose}.coalesced")
+
+        flight.waiters += 1
+        try:
+            # Shielded: one caller going away must not cancel the call others are waiting on
+            if leader:
+                return await asyncio.shield(flight.task)
+            try:
+                return await asyncio.wait_for(asyncio.shield(flight.task), timeout)
+            except TimeoutError:
+                # The shared call still owns the breaker verdict; this caller just stops waiting
+                metrics.incr(f"llm.{purpose}.coalesced_timeouts")
+                raise LLMUnavailable("timeout")
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Nobody wants the answer any more (e.g. a discarded speculative call)
+                if self._pending.get(key) is flight:
+                    del self._pending[key]
+                flight.task.cancel()
+
+    def _settle(self, key: str, task: asyncio.Task):
+        flight = self._pending.get(key)
+        if flight is not None and flight.task is task:
+            del self._pending[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here so an unawaited failure isn't logged as "never retrieved"
+
+    async def _call(self, llm, messages: list, purpose: str, restaurant_id: str | None, timeout: float):
+        if not self.breaker.allow():
+            metrics.incr(f"llm.{purpose}.short_circuited")
+            raise LLMUnavailable("circuit_open")
+
+        started = time.perf_counter()
+        try:
+            async with asyncio.timeout(timeout):
+                async with self._restaurant_slot(restaurant_id), self._global:
+                    metrics.latency(f"llm.{purpose}.queue").since(started)
+                    self.in_flight += 1
+                    try:
+                        response = await llm.ainvoke(messages)
+                    finally:
+                        self.in_flight -= 1
+        except asyncio.CancelledError:
+            # Caller went away — no verdict on the LLM, but don't leave a probe slot taken
+            self.breaker.probing = False
+            raise
+        except TimeoutError:
+            self.breaker.record_failure()
+            metrics.incr(f"llm.{purpose}.timeouts")
+            logger.warning(f"LLM {purpose} call exceeded {timeout:.1f}s deadline")
+            raise LLMUnavailable("timeout")
+        except Exception as e:
+            self.breaker.record_failure()
+            metrics.incr(f"llm.{purpose}.errors")
+            logger.warning(f"LLM {purpose} call failed: {e}")
+            raise LLMUnavailable("error") from e
+
+        self.breaker.record_success()
+        metrics.incr(f"llm.{purpose}.calls")
+        metrics.latency(f"llm.{purpose}").since(started)
+        return response
+
+    def stats(self) -> dict:
+        return {
+            "circuit": self.breaker.state,
+            "consecutive_failures": self.breaker.consecutive,
+            "in_flight": self.in_flight,
+            "coalescing": len(self._pending),
+        }
+
+
+gateway = LLMGateway(
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    per_restaurant=settings.LLM_MAX_CONCURRENCY_PER_RESTAURANT,
+    breaker=CircuitBreaker(settings.LLM_BREAKER_FAILURES, settings.LLM_BREAKER_COOLDOWN_SECONDS),
+    single_flight=settings.LLM_SINGLE_FLIGHT,
+)
@@ -0,0 +1,247 @@
+"""Menu search — per-branch fuzzy item-name index: trigrams + consonant skeletons over Hinglish-folded names.
+
+Names and queries go through the same folding: Devanagari transliterated to
+Latin, aspirates / doubled letters / long vowels folded ("paneer" ≈ "panir" ≈
+"पनीर", "tikka" ≈ "tika" ≈ "टिक्का"). Each word is indexed by its character
+trigrams and its consonant skeleton; a query is scored word-by-word against
+the candidate names the postings return, independent of word order.
+"""
+import re
+import time
+
+from app.bot.intent_cache import normalize
+from app.config import settings
+from app.services import metrics
+from app.services.menu_snapshot import menu_snapshots, ItemView, MenuSnapshot
+
+# ─── Devanagari → Latin ─────────────────────────────────────────
+
+_CONSONANTS = {
+    "क": "k", "ख": "kh", "ग": "g", "घ": "gh", "ङ": "n",
+    "च": "ch", "छ": "chh", "ज": "j", "झ": "jh", "ञ": "n",
+    "ट": "t", "ठ": "th", "ड": "d", "ढ": "dh", "ण": "n",
+    "त": "t", "थ": "th", "द": "d", "ध": "dh", "न": "n",
+    "प": "p", "फ": "ph", "ब": "b", "भ": "bh", "म": "m",
+    "य": "y", "र": "r", "ल": "l", "व": "v",
+    "श": "sh", "ष": "sh", "स": "s", "ह": "h",
+}
+_VOWELS = {
+    "अ": "a", "आ": "aa", "इ": "i", "ई": "ee", "उ": "u", "ऊ": "oo",
+    "ऋ": "ri", "ए": "e", "ऐ": "ai", "ओ": "o", "औ": "au",
+}
+_MATRAS = {
+    "ा": "aa", "ि": "i", "ी": "ee", "ु": "u", "ू": "oo",
+    "ृ": "ri", "े": "e", "ै": "ai", "ो": "o", "ौ": "au",
+}
+_VIRAMA = "्"
+_ANUSVARA = "ं"
+_VISARGA = "ः"
+_FINAL_LONG = re.compile(r"(aa|ee)\b")
+_FINAL_SHORT = {"aa": "a", "ee": "i"}
+
+
+def transliterate(text: str) -> str:
+    """Devanagari to the usual Latin menu spelling ("पनीर" → "paneer", "आलू" → "aaloo"); other text unchanged.
+
+    Consonants carry an inherent 'a' that a matra replaces and a word end drops.
+    """
+    out: list[str] = []
+    inherent = False  # the last thing written is a consonant's implicit 'a'
+    for ch in text:
+        if ch in _CONSONANTS:
+            out.append(_CONSONANTS[ch] + "a")
+            inherent = True
+            continue
+        if ch in _MATRAS or ch == _VIRAMA:
+            if inherent:
+                out[-1] = out[-1][:-1]
+            if ch != _VIRAMA:
+                out.append(_MATRAS[ch])
+        elif ch in _VOWELS:
+            out.append(_VOWELS[ch])
+        elif ch == _ANUSVARA:
+            out.append("n")
+        elif ch == _VISARGA:
+            out.append("h")
+        else:
+            # Word boundary: "dala" → "dal", "matara" → "matar"
+            if inherent and not ch.isalnum() and len(out) > 1:
+                out[-1] = out[-1][:-1]
+            out.append(ch)
+        inherent = False
+    if inherent and len(out) > 1:
+        out[-1] = out[-1][:-1]
+    # Long vowels are usually written short at a word end: "tikka", "gobi", "makhani"
+    return _FINAL_LONG.sub(lambda m: _FINAL_SHORT[m.group(1)], "".join(out))
+
+
+# ─── Hinglish phonetic folding ──────────────────────────────────
+
+_FOLDS = [
+    ("chh", "ch"), ("ch", "\x01"), ("ck", "k"), ("c", "k"), ("\x01", "c"),
+    ("ph", "f"), ("w", "v"), ("z", "j"), ("q", "k"), ("x", "ks"),
+    ("kh", "k"), ("gh", "g"), ("jh", "j"), ("th", "t"), ("dh", "d"), ("bh", "b"), ("sh", "s"),
+    ("ee", "i"), ("ii", "i"), ("ea", "i"), ("oo", "u"), ("uu", "u"), ("aa", "a"), ("ey", "e"),
+]
+_REPEATS = re.compile(r"(.)\1+")
+_VOWEL_RE = re.compile(r"[aeiouy]")
+
+
+def fold_word(word: str) -> str:
+    for a, b in _FOLDS:
+        word = word.replace(a, b)
+    word = _REPEATS.sub(r"\1", word)
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        word = word[:-1]  # plurals: naans, momos, rotis
+    return word
+
+
+def fold(text: str) -> list[str]:
+    """Searchable words of a name or query."""
+    return [fold_word(w) for w in transliterate(normalize(text)).split() if w]
+
+
+def _trigrams(word: str) -> frozenset[str]:
+    padded = f" {word} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def _skeleton(word: str) -> str:
+    return _VOWEL_RE.sub("", word)
+
+
+class _Word:
+    __slots__ = ("text", "grams", "skeleton")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.grams = _trigrams(text)
+        self.skeleton = _skeleton(text)
+
+
+def _word_similarity(q: _Word, w: _Word) -> float:
+    if q.text == w.text:
+        return 1.0
+    sim = 2 * len(q.grams & w.grams) / (len(q.grams) + len(w.grams))
+    # Same consonants, different vowels: "panir" / "paner", "rajma" / "rajmah"
+    if len(q.skeleton) >= 2 and q.skeleton == w.skeleton:
+        sim = max(sim, 0.8)
+    # Prefix typing: "pan" → "panir"
+    elif len(q.text) >= 3 and w.text.startswith(q.text):
+        sim = max(sim, 0.7)
+    return sim
+
+
+def _score(query: list[_Word], name: list[_Word]) -> float:
+    """Mean best-match similarity of the query words, lightly penalising unmatched name words."""
+    if not query or not name:
+        return 0.0
+    best_q = [max(_word_similarity(q, w) for w in name) for q in query]
+    covered = sum(1 for w in name if any(_word_similarity(q, w) >= 0.6 for q in query))
+    return 0.85 * (sum(best_q) / len(best_q)) + 0.15 * (covered / len(name))
+
+
+def name_similarity(query: str, name: str) -> float:
+    """Similarity in [0, 1] of a typed name to an item name (same scoring as the index)."""
+    return _score([_Word(w) for w in fold(query)], [_Word(w) for w in fold(name)])
+
+
+# ─── Index ──────────────────────────────────────────────────────
+
+class MenuSearchIndex:
+    """One branch's available items; updated item-by-item as menu snapshots change."""
+
+    def __init__(self):
+        self.source: float | None = None  # built_at of the snapshot last synced
+        self._names: dict[str, tuple[str, list[_Word]]] = {}  # item_id -> (raw name, folded words)
+        self._postings: dict[str, set[str]] = {}               # trigram / "~skeleton" -> item ids
+
+    @staticmethod
+    def _keys(words: list[_Word]) -> set[str]:
+        keys = set()
+        for w in words:
+            keys |= w.grams
+            if len(w.skeleton) >= 2:
+                keys.add("~" + w.skeleton)
+        return keys
+
+    def add(self, item_id: str, name: str):
+        self.remove(item_id)
+        words = [_Word(w) for w in fold(name)]
+        self._names[item_id] = (name, words)
+        for key in self._keys(words):
+            self._postings.setdefault(key, set()).add(item_id)
+
+    def remove(self, item_id: str):
+        entry = self._names.pop(item_id, None)
+        if entry is None:
+            return
+        for key in self._keys(entry[1]):
+            ids = self._postings.get(key)
+            if ids is not None:
+                ids.discard(item_id)
+                if not ids:
+                    del self._postings[key]
+
+    def sync(self, snapshot: MenuSnapshot) -> int:
+        """Apply the difference to `snapshot` (added, removed, renamed items); returns how many changed."""
+        current = {str(i.id): i.name for i in snapshot.available_items}
+        changed = 0
+        for item_id in [i for i in self._names if i not in current]:
+            self.remove(item_id)
+            changed += 1
+        for item_id, name in current.items():
+            entry = self._names.get(item_id)
+            if entry is None or entry[0] != name:
+                self.add(item_id, name)
+                changed += 1
+        self.source = snapshot.built_at
+        return changed
+
+    def search(self, query: str, k: int = 5, min_score: float = 0.0) -> list[tuple[str, float]]:
+        """Top-k (item_id, score) by descending score."""
+        words = [_Word(w) for w in fold(query)]
+        if not words:
+            return []
+        candidates = set()
+        for key in self._keys(words):
+            candidates |= self._postings.get(key, set())
+        scored = []
+        for item_id in candidates:
+            score = _score(words, self._names[item_id][1])
+            if score >= min_score:
+                scored.append((item_id, score))
+        scored.sort(key=lambda s: (-s[1], self._names[s[0]][0]))
+        return scored[:k]
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+class MenuSearch:
+    def __init__(self, min_score: float):
+        self.min_score = min_score
+        self._indexes: dict[str, MenuSearchIndex] = {}
+
+    def index_for(self, snapshot: MenuSnapshot) -> MenuSearchIndex:
+        index = self._indexes.get(snapshot.branch_id)
+        if index is None:
+            index = self._indexes[snapshot.branch_id] = MenuSearchIndex()
+        if index.source != snapshot.built_at:
+            started = time.perf_counter()
+            index.sync(snapshot)
+            metrics.latency("menu_search.sync").since(started)
+        return index
+
+    async def search(
+        self, branch_id: str, query: str, k: int = 10, min_score: float | None = None
+    ) -> list[tuple[ItemView, float]]:
+        """(item, score) of the best-matching available items of the branch, best first."""
+        snapshot = await menu_snapshots.get(branch_id)
+        started = time.perf_counter()
+        hits = self.index_for(snapshot).search(query, k, self.min_score if min_score is None else min_score)
+        metrics.latency("menu_search.query").since(started)
+        return [(item, score) for item_id, score in hits if (item := snapshot.item(item_id)) is not None]
+
+
+menu_search = MenuSearch(min_score=settings.MENU_SEARCH_MIN_SCORE)
@@ -1,24 +1,25 @@
 """Bot nodes — bill_generator + receipt_sender"""
 import uuid
+from langchain_core.runnables import RunnableConfig
 from app.bot.state import BotState
-from app.database import AsyncSessionLocal
+from app.bot.uow import bot_session
 from app.models.billing import Bill, BillStatus
 from app.models.orders import Order, OrderItem, OrderStatus
-from app.models.menu import MenuItem
+from app.bot.nodes.menu_and_format import menu_item as find_menu_item
 from app.models.customers import TableSession
 from app.models.tenancy import Table, Branch
 from sqlalchemy import select
 import time
 
 
-async def bill_generator(state: BotState) -> BotState:
+async def bill_generator(state: BotState, config: RunnableConfig | None = None) -> BotState:
     """Aggregate all open orders for the session into a consolidated bill."""
     session_id = state.get("session_id")
     if not session_id:
         state["error"] = "no_session"
         return state
 
-    async with AsyncSessionLocal() as db:
+    async with bot_session(config) as db:
         # Check if unpaid bill already exists
         exist = await db.execute(
             select(Bill).where(Bill.session_id == uuid.UUID(session_id), Bill.status == BillStatus.UNPAID)
@@ -37,8 +38,10 @@ async def bill_generator(state: BotState) -> BotState:
                 state["final_response"] = {"type": "text", "body": "No orders found for this table. Order something first! 😊"}
                 return state
 
-            sess_result = await db.execute(select(TableSession).where(TableSession.id == uuid.UUID(session_id)))
-            session = sess_result.scalar_one()
+            session = await db.get(TableSession, uuid.UUID(session_id))
+            if session is None:
+                state["error"] = "no_session"
+                return state
 
             subtotal = sum(o.subtotal for o in orders)
             cgst = sum(o.cgst_amount for o in orders)
@@ -69,9 +72,10 @@ async def bill_generator(state: BotState) -> BotState:
         for order in orders:
             items_r = await db.execute(select(OrderItem).where(OrderItem.order_id == order.id))
             for oi in items_r.scalars().all():
-                item_r = await db.execute(select(MenuItem).where(MenuItem.id == oi.menu_item_id))
-                mi = item_r.scalar_one()
-                lines.append(f"• {mi.name} ×{oi.quantity} — ₹{oi.line_total:.0f}")
+                mi = await find_menu_item(state.get("branch_id"), oi.menu_item_id, config)
+                # Keep the line even if the item was deleted since: the bill total includes it
+                name = mi.name if mi else "Item"
+                lines.append(f"• {name} ×{oi.quantity} — ₹{oi.line_total:.0f}")
 
         items_text = "\n".join(lines) if lines else "No items"
 
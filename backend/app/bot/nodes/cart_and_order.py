@@ -1,8 +1,11 @@
 """Bot nodes — cart_executor + checkout_guard + kitchen_dispatch"""
 import uuid
+from langchain_core.runnables import RunnableConfig
 from app.bot.state import BotState
-from app.database import AsyncSessionLocal
-from app.models.menu import MenuItem
+from app.bot.uow import bot_session
+from app.bot.nodes.menu_and_format import menu_item as find_menu_item
+from app.bot.menu_search import menu_search, name_similarity
+from app.config import settings
 from app.models.cart import Cart, CartItem, CartStatus
 from app.models.customers import TableSession
 from app.services.cart_service import add_item_to_cart, remove_cart_item, get_or_create_cart
@@ -11,8 +14,11 @@ from app.services.ws_manager import manager
 from app.models.tenancy import Table
 from sqlalchemy import select
 
+# Fuzzy name matches closer than this to the best one are offered as a choice
+AMBIGUOUS_MARGIN = 0.05
 
-async def cart_executor(state: BotState) -> BotState:
+
+async def cart_executor(state: BotState, config: RunnableConfig | None = None) -> BotState:
     """Handle ADD_ITEM / REMOVE_ITEM / UPDATE_QTY / CART_VIEW intents."""
     intent = state.get("intent")
     session_id = state.get("session_id")
@@ -22,10 +28,13 @@ async def cart_executor(state: BotState) -> BotState:
     if not session_id:
         state["error"] = "no_session"
         return state
+    if not branch_id:
+        state["error"] = "no_branch_id"
+        return state
 
     # ── CART_VIEW ────────────────────────────────────────────────
     if intent == "CART_VIEW":
-        async with AsyncSessionLocal() as db:
+        async with bot_session(config) as db:
             cart = await get_or_create_cart(uuid.UUID(session_id), db)
             result = await db.execute(select(CartItem).where(CartItem.cart_id == cart.id))
             items = result.scalars().all()
@@ -35,8 +44,7 @@ async def cart_executor(state: BotState) -> BotState:
 
             lines = []
             for ci in items:
-                item_r = await db.execute(select(MenuItem).where(MenuItem.id == ci.menu_item_id))
-                mi = item_r.scalar_one_or_none()
+                mi = await find_menu_item(branch_id, ci.menu_item_id, config)
                 if not mi: continue
                 lines.append(f"• {mi.name} ×{ci.quantity} — ₹{ci.line_total:.0f}" + (f"\n  📝 {ci.notes}" if ci.notes else ""))
 
@@ -60,37 +68,40 @@ async def cart_executor(state: BotState) -> BotState:
             state["final_response"] = {"type": "text", "body": "What would you like to add? Say e.g. *add 2 paneer tikka*."}
             return state
 
-        async with AsyncSessionLocal() as db:
-            menu_item = None
-            item_id = entities.get("item_id")
-            
-            if item_id:
-                try:
-                    res = await db.execute(select(MenuItem).where(MenuItem.id == uuid.UUID(item_id)))
-                    menu_item = res.scalar_one_or_none()
-                except Exception:
-                    pass
-            
-            if not menu_item and item_name:
-                # Fuzzy match item by name in branch
-                items_result = await db.execute(
-                    select(MenuItem).where(
-                        MenuItem.branch_id == uuid.UUID(branch_id),
-                        MenuItem.is_available == True,
-                    )
-                )
-                all_items = items_result.scalars().all()
-                matched = [i for i in all_items if item_name.lower() in i.name.lower()]
-                if matched:
-                    menu_item = matched[0]
-
-            if not menu_item:
+        menu_item = None
+        item_id = entities.get("item_id")
+
+        if item_id:
+            menu_item = await find_menu_item(branch_id, item_id, config)
+
+        if not menu_item and item_name:
+            # Fuzzy match item by name (typos, Hinglish spellings, Devanagari) in the branch's menu
+            hits = await menu_search.search(branch_id, item_name, k=5)
+            if len(hits) > 1 and hits[0][1] - hits[1][1] < AMBIGUOUS_MARGIN:
+                # "paneer" → Palak / Kadai / Matar Paneer: let the diner pick
+                rows = [{
+                    "id": f"item_{item.id}",
+                    "title": f"{'🟢' if item.is_veg else '🔴'} {item.name}"[:24],
+                    "description": f"₹{item.base_price:.0f}",
+                } for item, score in hits if hits[0][1] - score < AMBIGUOUS_MARGIN]
                 state["final_response"] = {
-                    "type": "text",
-                    "body": f"❌ Couldn't find that item. Say *show menu* to browse.",
+                    "type": "list",
+                    "body": f"Which *{item_name}* would you like? 👇",
+                    "button_label": "View Items",
+                    "sections": [{"title": "Matching Items", "rows": rows}],
                 }
                 return state
+            if hits:
+                menu_item = hits[0][0]
+
+        if not menu_item:
+            state["final_response"] = {
+                "type": "text",
+                "body": f"❌ Couldn't find that item. Say *show menu* to browse.",
+            }
+            return state
 
+        async with bot_session(config) as db:
             try:
                 cart = await add_item_to_cart(
                     session_id=uuid.UUID(session_id),
@@ -120,18 +131,18 @@ async def cart_executor(state: BotState) -> BotState:
     # ── REMOVE_ITEM ──────────────────────────────────────────────
     if intent == "REMOVE_ITEM":
         item_name = entities.get("item_name", "")
-        async with AsyncSessionLocal() as db:
+        async with bot_session(config) as db:
             cart = await get_or_create_cart(uuid.UUID(session_id), db)
             items_result = await db.execute(select(CartItem).where(CartItem.cart_id == cart.id))
             cart_items = items_result.scalars().all()
 
             target = None
+            best = settings.MENU_SEARCH_MIN_SCORE
             for ci in cart_items:
-                item_r = await db.execute(select(MenuItem).where(MenuItem.id == ci.menu_item_id))
-                mi = item_r.scalar_one()
-                if item_name.lower() in mi.name.lower():
-                    target = ci
-                    break
+                mi = await find_menu_item(branch_id, ci.menu_item_id, config)
+                score = name_similarity(item_name, mi.name) if mi else 0.0
+                if score >= best:
+                    target, best = ci, score
 
             if not target:
                 state["final_response"] = {"type": "text", "body": f"❌ *{item_name}* not found in your cart."}
@@ -147,14 +158,14 @@ async def cart_executor(state: BotState) -> BotState:
     return state
 
 
-async def checkout_guard_node(state: BotState) -> BotState:
+async def checkout_guard_node(state: BotState, config: RunnableConfig | None = None) -> BotState:
     """Show order summary and ask for CONFIRM button."""
     session_id = state.get("session_id")
     if not session_id:
         state["error"] = "no_session"
         return state
 
-    async with AsyncSessionLocal() as db:
+    async with bot_session(config) as db:
         cart = await get_or_create_cart(uuid.UUID(session_id), db)
         result = await db.execute(select(CartItem).where(CartItem.cart_id == cart.id))
         items = result.scalars().all()
@@ -165,8 +176,7 @@ async def checkout_guard_node(state: BotState) -> BotState:
 
         lines = []
         for ci in items:
-            item_r = await db.execute(select(MenuItem).where(MenuItem.id == ci.menu_item_id))
-            mi = item_r.scalar_one_or_none()
+            mi = await find_menu_item(state.get("branch_id"), ci.menu_item_id, config)
             if not mi: continue
             lines.append(f"• {mi.name} ×{ci.quantity} — ₹{ci.line_total:.0f}")
 
@@ -188,19 +198,18 @@ async def checkout_guard_node(state: BotState) -> BotState:
     return state
 
 
-async def kitchen_dispatch(state: BotState) -> BotState:
+async def kitchen_dispatch(state: BotState, config: RunnableConfig | None = None) -> BotState:
     """Actually place the order — called when customer taps Confirm."""
     session_id = state.get("session_id")
     if not session_id:
         state["error"] = "no_session"
         return state
 
-    async with AsyncSessionLocal() as db:
+    async with bot_session(config) as db:
         try:
             order = await create_order_from_cart(uuid.UUID(session_id), db)
             # Broadcast realtime to kitchen PWA
-            table_result = await db.execute(select(Table).where(Table.id == order.table_id))
-            table = table_result.scalar_one_or_none()
+            table = await db.get(Table, order.table_id)
             if not table:
                 raise CheckoutError("Table associated with order not found")
 
@@ -225,5 +234,7 @@ async def kitchen_dispatch(state: BotState) -> BotState:
                 ),
             }
         except CheckoutError as e:
+            # Don't leave a half-built order in the invocation's shared session
+            await db.rollback()
             state["final_response"] = {"type": "text", "body": f"⚠️ {e}"}
     return state
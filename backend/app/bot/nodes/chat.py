@@ -1,12 +1,13 @@
 """Bot node — restaurant_chat for general Q&A."""
-import uuid
+from langchain_core.runnables import RunnableConfig
 from app.bot.state import BotState
-from app.database import AsyncSessionLocal
-from app.models.tenancy import Restaurant, Branch
-from sqlalchemy import select
+from app.bot.uow import release
+from app.bot.restaurant_context import restaurant_contexts
+from app.bot.faq_store import faq_store
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import SystemMessage, HumanMessage
 from app.config import settings
+from app.bot.llm_gateway import gateway
 
 llm = ChatGoogleGenerativeAI(
     model="gemini-1.5-flash",
@@ -14,8 +15,8 @@ llm = ChatGoogleGenerativeAI(
     temperature=0.7,
 )
 
-async def restaurant_chat(state: BotState) -> BotState:
-    """Answers general questions about the restaurant using LLM + DB context."""
+async def restaurant_chat(state: BotState, config: RunnableConfig | None = None) -> BotState:
+    """Answers general questions: FAQ store first, then LLM with the cached restaurant context."""
     restaurant_id = state.get("restaurant_id")
     branch_id = state.get("branch_id")
     message = state.get("message_text", "")
@@ -23,46 +24,39 @@ async def restaurant_chat(state: BotState) -> BotState:
     if not restaurant_id:
         return state
 
-    async with AsyncSessionLocal() as db:
-        # Fetch restaurant and branch info for context
-        res = await db.execute(select(Restaurant).where(Restaurant.id == uuid.UUID(restaurant_id)))
-        restaurant = res.scalar_one_or_none()
-        
-        branch_info = ""
-        if branch_id:
-            br_res = await db.execute(select(Branch).where(Branch.id == uuid.UUID(branch_id)))
-            branch = br_res.scalar_one_or_none()
-            if branch:
-                branch_info = f"This branch is located at {branch.address}, {branch.city}, {branch.state} - {branch.pincode}."
+    # Both are cached; the DB is only read on a miss
+    context = await restaurant_contexts.get(restaurant_id, branch_id, config)
+    faq = await faq_store.match(restaurant_id, branch_id, message, config)
+    # Give the connection back before Gemini is called
+    await release(config)
 
-        restaurant_name = restaurant.name if restaurant else "our restaurant"
-        
-        system_prompt = f"""You are a helpful, friendly, and professional AI assistant for {restaurant_name}.
-{branch_info}
+    if faq is not None:
+        state["final_response"] = {"type": "text", "body": faq.answer}
+        return state
 
-Guidelines:
-1. Answer questions about the restaurant, its food, culture, and services.
-2. If asked about ratings or staff, be polite and say we strive for excellence.
-3. Keep answers concise (max 2-3 sentences).
-4. Do NOT make up specific menu prices if you don't have them, but you can say we have a variety of items.
-5. If the user wants to order, guide them to say "show menu" or "list items".
-6. Use emojis to be friendly.
-"""
+    try:
+        response = await gateway.invoke(
+            llm, [SystemMessage(content=context.system_prompt), HumanMessage(content=message)],
+            purpose="chat",
+            restaurant_id=restaurant_id,
+            timeout=settings.LLM_CHAT_TIMEOUT_SECONDS,
+        )
+        answer = response.content.strip()
+        state["final_response"] = {
+            "type": "text",
+            "body": answer
+        }
+    except Exception as e:  # LLMUnavailable (timeout / error / open breaker) or an unusable reply
+        print(f"Chat node error: {e}")
+        state["final_response"] = {
+            "type": "text",
+            "body": f"I'm here to help! Feel free to ask about {context.restaurant_name} or just say 'menu' to see our delicious food! 🥗"
+        }
+        return state
 
-        try:
-            response = await llm.ainvoke([
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=message)
-            ])
-            state["final_response"] = {
-                "type": "text",
-                "body": response.content.strip()
-            }
-        except Exception as e:
-            print(f"Chat node error: {e}")
-            state["final_response"] = {
-                "type": "text",
-                "body": f"I'm here to help! Feel free to ask about {restaurant_name} or just say 'menu' to see our delicious food! 🥗"
-            }
+    try:
+        await faq_store.remember(restaurant_id, branch_id, message, answer, config)
+    except Exception as e:
+        print(f"FAQ write-back failed: {e}")
 
     return state
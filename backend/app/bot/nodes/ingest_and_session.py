@@ -1,63 +1,44 @@
 """Bot nodes — ingest_webhook & resolve_session"""
 import re
+from app.bot import payload
+from langchain_core.runnables import RunnableConfig
 from app.bot.state import BotState
-from app.database import AsyncSessionLocal
+from app.bot.uow import bot_session
 from app.models.tenancy import Restaurant, Branch, Table, TableQRToken
 from app.models.customers import Customer, TableSession, SessionStatus, PreferredLanguage
+from app.services.session_activity import session_activity
+from app.services.session_cache import session_cache
+from app.services.tenant_cache import tenant_cache
 from sqlalchemy import select
 from datetime import datetime, timezone
 import uuid
 
 
-def _extract_text(msg: dict) -> tuple[str, str]:
-    """Returns (text, message_type)."""
-    msg_type = msg.get("type", "text")
-    if msg_type == "text":
-        return msg.get("text", {}).get("body", ""), "text"
-    elif msg_type == "interactive":
-        inter = msg.get("interactive", {})
-        if inter.get("type") == "button_reply":
-            return inter["button_reply"]["id"], "interactive"
-        elif inter.get("type") == "list_reply":
-            return inter["list_reply"]["id"], "interactive"
-    return "", msg_type
-
-
 async def ingest_webhook(state: BotState) -> BotState:
-    """Parse raw WA payload into state fields."""
-    raw = state.get("raw_message", {})
-    entry = raw.get("entry", [{}])[0]
-    changes = entry.get("changes", [{}])[0]
-    value = changes.get("value", {})
-    messages = value.get("messages", [])
-    if not messages:
-        state["error"] = "no_message"
-        return state
-
-    msg = messages[0]
-    wa_user_id = msg.get("from", "")
-    wa_message_id = msg.get("id", "")
-    text, msg_type = _extract_text(msg)
+    """Copy the parsed inbound message into state fields."""
+    inbound = state.get("inbound")
+    if inbound is None:
+        # Callers that pass a raw WA payload (scripts, simulations) — use its first message
+        messages = payload.from_dict(state.get("raw_message", {})).messages
+        if not messages:
+            state["error"] = "no_message"
+            return state
+        inbound = messages[0]
 
     # Map phone_number_id → restaurant (if not already pre-filled from URL)
     if not state.get("restaurant_id"):
-        phone_number_id = value.get("metadata", {}).get("phone_number_id", "")
-        async with AsyncSessionLocal() as db:
-            rest_result = await db.execute(
-                select(Restaurant).where(Restaurant.whatsapp_phone_number_id == phone_number_id)
-            )
-            restaurant = rest_result.scalar_one_or_none()
-            if restaurant:
-                state["restaurant_id"] = str(restaurant.id)
-
-    state["wa_user_id"] = wa_user_id
-    state["wa_message_id"] = wa_message_id
-    state["message_text"] = text
-    state["message_type"] = msg_type
+        restaurant = await tenant_cache.get_by_phone_number_id(inbound.phone_number_id)
+        if restaurant:
+            state["restaurant_id"] = str(restaurant.id)
+
+    state["wa_user_id"] = inbound.wa_user_id
+    state["wa_message_id"] = inbound.wa_message_id
+    state["message_text"] = inbound.text
+    state["message_type"] = inbound.message_type
     return state
 
 
-async def resolve_session(state: BotState) -> BotState:
+async def resolve_session(state: BotState, config: RunnableConfig | None = None) -> BotState:
     """Handle QR scan (creates session) or look up existing active session."""
     text = state.get("message_text", "")
     restaurant_id = state.get("restaurant_id")
@@ -66,6 +47,10 @@ async def resolve_session(state: BotState) -> BotState:
     if not restaurant_id:
         state["error"] = "unknown_restaurant"
         return state
+    if not wa_user_id:
+        # Keys the session cache and the customer row — never look either up with a blank sender
+        state["error"] = "no_wa_user_id"
+        return state
 
     # ── QR scan ──────────────────────────────────────────────────
     if "HELLODINE_START" in text.upper():
@@ -80,7 +65,7 @@ async def resolve_session(state: BotState) -> BotState:
         table_num = params.get("table")
         token_val = params.get("token")
 
-        async with AsyncSessionLocal() as db:
+        async with bot_session(config) as db:
             # Validate token
             tok_result = await db.execute(
                 select(TableQRToken).where(
@@ -104,8 +89,10 @@ async def resolve_session(state: BotState) -> BotState:
                 return state
 
             # Get branch and verify it belongs to this restaurant
-            branch_result = await db.execute(select(Branch).where(Branch.id == table.branch_id))
-            branch = branch_result.scalar_one()
+            branch = await db.get(Branch, table.branch_id)
+            if not branch:
+                state["error"] = "branch_not_found"
+                return state
 
             if str(branch.restaurant_id) != restaurant_id:
                 state["error"] = "token_restaurant_mismatch"
@@ -125,7 +112,8 @@ async def resolve_session(state: BotState) -> BotState:
             old_sess = await db.execute(
                 select(TableSession).where(TableSession.table_id == table.id, TableSession.status == SessionStatus.ACTIVE)
             )
-            for s in old_sess.scalars().all():
+            closed = old_sess.scalars().all()
+            for s in closed:
                 s.status = SessionStatus.CLOSED
                 s.closed_at = datetime.now(timezone.utc)
 
@@ -138,6 +126,17 @@ async def resolve_session(state: BotState) -> BotState:
             db.add(session)
             await db.commit()
             await db.refresh(session)
+            for s in closed:
+                session_activity.forget(s.id)
+                await session_cache.invalidate_session(s.id)
+            await session_cache.put(
+                restaurant_id, wa_user_id,
+                session_id=str(session.id),
+                customer_id=str(customer.id),
+                branch_id=str(branch.id),
+                table_id=str(table.id),
+                preferred_language=customer.preferred_language,
+            )
 
             state["session_id"] = str(session.id)
             state["customer_id"] = str(customer.id)
@@ -151,8 +150,19 @@ async def resolve_session(state: BotState) -> BotState:
             state["intent"] = "QR_SCAN"
         return state
 
+    # ── Known diner: active session context from the cache ─────────────
+    ctx = await session_cache.get(restaurant_id, wa_user_id)
+    if ctx is not None:
+        session_activity.touch(uuid.UUID(ctx.session_id), datetime.now(timezone.utc))
+        state["session_id"] = ctx.session_id
+        state["customer_id"] = ctx.customer_id
+        state["branch_id"] = ctx.branch_id
+        state["table_id"] = ctx.table_id
+        state["preferred_language"] = ctx.preferred_language
+        return state
+
     # ── Look up existing active session for this customer ──────────────
-    async with AsyncSessionLocal() as db:
+    async with bot_session(config) as db:
         cust_result = await db.execute(
             select(Customer).where(Customer.restaurant_id == uuid.UUID(restaurant_id), Customer.wa_user_id == wa_user_id)
         )
@@ -172,27 +182,37 @@ async def resolve_session(state: BotState) -> BotState:
         # ── Inactivity Timeout (2 Hours) ──────────────────────────
         # If the customer hasn't messaged in 2 hours, expire the session
         # so they can't order remotely later.
+        now = datetime.now(timezone.utc)
         if session:
-            now = datetime.now(timezone.utc)
-            delta = now - session.last_message_at
+            delta = now - session_activity.last_seen(session.id, session.last_message_at)
             if delta.total_seconds() > (2 * 3600):
                 session.status = SessionStatus.CLOSED
                 session.closed_at = now
                 await db.commit()
+                session_activity.forget(session.id)
+                await session_cache.invalidate_session(session.id)
                 session = None
 
         if not session:
             state["error"] = "no_session"
             return state
 
-        # Update last_message_at
-        session.last_message_at = datetime.now(timezone.utc)
-        await db.commit()
+        # Update last_message_at — buffered, written in batches by session_activity
+        session_activity.touch(session.id, now)
 
         state["session_id"] = str(session.id)
         state["customer_id"] = str(customer.id)
         state["branch_id"] = str(session.branch_id)
         state["table_id"] = str(session.table_id)
         state["preferred_language"] = customer.preferred_language
+        await session_cache.put(
+            restaurant_id, wa_user_id,
+            session_id=str(session.id),
+            customer_id=str(customer.id),
+            branch_id=str(session.branch_id),
+            table_id=str(session.table_id),
+            preferred_language=customer.preferred_language,
+            last_message_at=now,
+        )
 
     return state
@@ -1,10 +1,28 @@
 """Bot nodes — detect_language (lightweight) + intent_router (Gemini)"""
 import json
+import logging
+import time
+
+import orjson
+from langchain_core.runnables import RunnableConfig
+from app.bot import interactive, speculative
+from app.bot.intent_cache import intent_cache
+from app.bot.intent_classifier import load_default, extract_entities
+from app.bot.llm_gateway import gateway, LLMUnavailable
 from app.bot.state import BotState
+from app.bot.uow import release
 from app.config import settings
+from app.services import metrics
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage
 
+# The prompt's CONFIRM means "show the summary"; PLACE_ORDER only comes from the confirm button
+LLM_INTENT_ALIASES = {"CONFIRM": "CONFIRM_SUMMARY"}
+
+label_logger = logging.getLogger("app.bot.intent_label")
+
+classifier = load_default() if settings.INTENT_CLASSIFIER_ENABLED else None
+
 llm = ChatGoogleGenerativeAI(
     model="gemini-1.5-flash",
     google_api_key=settings.GEMINI_API_KEY,
@@ -36,6 +54,36 @@ Customer message: "{message}"
 """
 
 
+def keyword_shortcut(text: str) -> tuple[str, dict] | None:
+    """Substring rules used before the local classifier existed (and when no model is loaded)."""
+    lower = text.lower().strip()
+    if any(w in lower for w in ["confirm", "place order", "done", "चेकआउट", "order kar"]):
+        return "CONFIRM_SUMMARY", {}
+    if any(w in lower for w in ["bill", "check", "pay", "payment", "बिल"]):
+        return "BILL", {}
+    if any(w in lower for w in ["cart", "my order", "show cart", "टोकरी"]):
+        return "CART_VIEW", {}
+    if any(w in lower for w in ["menu", "list", "show", "browse", "सूची"]):
+        return "BROWSE", {}
+
+    # Veg / Non-Veg Filtering
+    if any(w in lower for w in ["veg", "शाकाहारी", "vegetarian"]):
+        return "BROWSE", {"is_veg": True}
+    if any(w in lower for w in ["non-veg", "मांसाहारी", "non veg", "chicken", "meat"]):
+        return "BROWSE", {"is_veg": False}
+    return None
+
+
+def _rule_based_fallback(text: str) -> tuple[str, dict]:
+    """Best answer without Gemini: the classifier's guess if its entities are readable, else keywords."""
+    if classifier is not None:
+        intent, _ = classifier.predict(text)
+        entities = extract_entities(intent, text)
+        if entities is not None:
+            return intent, entities
+    return keyword_shortcut(text) or ("BROWSE", {})
+
+
 async def detect_language(state: BotState) -> BotState:
     """Lightweight: detect Hindi vs English from Unicode range."""
     text = state.get("message_text", "")
@@ -47,7 +95,49 @@ async def detect_language(state: BotState) -> BotState:
     return state
 
 
-async def intent_router(state: BotState) -> BotState:
+def local_intent(text: str) -> tuple[str, dict | None] | None:
+    """Interactive IDs, then the local classifier (keyword shortcuts when no model is loaded); None → ask Gemini."""
+    # 1. Interactive Button/List IDs (Priority) — same table the fast path dispatches on
+    hit = interactive.match(text)
+    if hit is not None:
+        return hit
+
+    # 2. Local classifier; keyword shortcuts only when no model is loaded
+    if classifier is not None:
+        started = time.perf_counter()
+        intent, confidence = classifier.predict(text)
+        metrics.latency("intent_classifier.predict").since(started)
+        entities = extract_entities(intent, text) if confidence >= settings.INTENT_CLASSIFIER_THRESHOLD else None
+        if entities is not None:
+            metrics.incr("intent_classifier.resolved")
+            return intent, entities
+        metrics.incr("intent_classifier.deferred")
+        return None
+    return keyword_shortcut(text)
+
+
+async def llm_classify(text: str, restaurant_id: str | None) -> tuple[str, dict]:
+    """Gemini's (intent, entities); raises LLMUnavailable, or ValueError on an unparseable reply."""
+    # Not str.format — the prompt's JSON example has literal braces
+    prompt = INTENT_PROMPT.replace("{message}", text)
+    response = await gateway.invoke(
+        llm, [HumanMessage(content=prompt)],
+        purpose="intent",
+        restaurant_id=restaurant_id,
+        timeout=settings.LLM_INTENT_TIMEOUT_SECONDS,
+    )
+    raw = response.content.strip()
+    # Strip markdown code fences if present
+    if raw.startswith("```"):
+        raw = raw.split("```")[1]
+        if raw.startswith("json"):
+            raw = raw[4:]
+    parsed = json.loads(raw)
+    intent = str(parsed.get("intent") or "OTHER")
+    return LLM_INTENT_ALIASES.get(intent, intent), parsed.get("entities") or {}
+
+
+async def intent_router(state: BotState, config: RunnableConfig | None = None) -> BotState:
     """Use Gemini to classify intent + extract entities."""
     # If QR scan already detected, skip
     if state.get("intent") == "QR_SCAN":
@@ -58,84 +148,47 @@ async def intent_router(state: BotState) -> BotState:
         state["intent"] = "OTHER"
         return state
 
-    # Quick rule-based shortcuts (avoid LLM for common patterns)
-    lower = text.lower().strip()
-
-    # 1. Interactive Button/List IDs (Priority)
-    if lower == "do_confirm":
-        state["intent"] = "PLACE_ORDER" # Kitchen!
-        return state
-    if lower == "confirm_order":
-        state["intent"] = "CONFIRM_SUMMARY" # Preview
-        return state
-    if lower == "view_cart" or lower == "edit_cart":
-        state["intent"] = "CART_VIEW"
-        return state
-    if lower == "show_menu":
-        state["intent"] = "BROWSE"
+    # Started alongside resolve_session by the webhook (app/bot/speculative.py)?
+    branch_id = state.get("branch_id")
+    speculation = speculative.pending(config)
+    if speculation is not None and speculation.branch_id != branch_id:
+        # The cached session was stale: its guess was for another branch's cache
+        speculative.discard(speculation)
+        speculation = None
+    if speculation is None:
+        hit = local_intent(text)
+    else:
+        hit = speculation.local
+    if hit is not None:
+        state["intent"], entities = hit
+        if entities is not None:
+            state["entities"] = entities
         return state
 
-    # Interactive Quantity Choice: qty_2_UUID
-    if lower.startswith("qty_"):
-        parts = lower.split("_")
-        if len(parts) >= 3:
-            state["intent"] = "ADD_ITEM"
-            state["entities"] = {"item_id": parts[2], "quantity": int(parts[1])}
+    # Same phrasing already resolved by Gemini for this branch? (a speculative task looks it up itself)
+    task = speculation.task if speculation is not None else None
+    if task is None:
+        cached = await intent_cache.get(branch_id, text)
+        if cached is not None:
+            state["intent"], state["entities"] = cached
             return state
 
-    # Item selection from menu -> Show item info / qty buttons
-    if lower.startswith("item_"):
-        state["intent"] = "ITEM_INFO"
-        state["entities"] = {"item_id": lower.replace("item_", "")}
-        return state
-
-    # Category selection
-    if lower.startswith("cat_"):
-        state["intent"] = "BROWSE"
-        state["entities"] = {"category_id": lower.replace("cat_", "")}
-        return state
-
-    # 2. Text Shortcuts
-    if any(w in lower for w in ["confirm", "place order", "done", "चेकआउट", "order kar"]):
-        state["intent"] = "CONFIRM_SUMMARY"
-        state["entities"] = {}
-        return state
-    if any(w in lower for w in ["bill", "check", "pay", "payment", "बिल"]):
-        state["intent"] = "BILL"
-        state["entities"] = {}
-        return state
-    if any(w in lower for w in ["cart", "my order", "show cart", "टोकरी"]):
-        state["intent"] = "CART_VIEW"
-        state["entities"] = {}
-        return state
-    if any(w in lower for w in ["menu", "list", "show", "browse", "सूची"]):
-        state["intent"] = "BROWSE"
-        state["entities"] = {}
-        return state
-
-    # Veg / Non-Veg Filtering
-    if any(w in lower for w in ["veg", "शाकाहारी", "vegetarian"]):
-        state["intent"] = "BROWSE"
-        state["entities"] = {"is_veg": True}
-        return state
-    if any(w in lower for w in ["non-veg", "मांसाहारी", "non veg", "chicken", "meat"]):
-        state["intent"] = "BROWSE"
-        state["entities"] = {"is_veg": False}
-        return state
-
-    # LLM classification
+    # LLM classification — don't hold a pooled connection while Gemini answers
+    await release(config)
     try:
-        prompt = INTENT_PROMPT.format(message=text)
-        response = await llm.ainvoke([HumanMessage(content=prompt)])
-        raw = response.content.strip()
-        # Strip markdown code fences if present
-        if raw.startswith("```"):
-            raw = raw.split("```")[1]
-            if raw.startswith("json"):
-                raw = raw[4:]
-        parsed = json.loads(raw)
-        state["intent"] = parsed.get("intent", "OTHER")
-        state["entities"] = parsed.get("entities", {})
+        if task is not None:
+            intent, entities, from_cache = await task
+            metrics.incr("intent.speculative_used")
+        else:
+            intent, entities = await llm_classify(text, state.get("restaurant_id"))
+            from_cache = False
+        state["intent"], state["entities"] = intent, entities
+        if not from_cache:
+            await intent_cache.put(branch_id, text, intent, entities)
+            # Training data for the local classifier (see train_intent_model.py)
+            label_logger.info("intent.label %s", orjson.dumps({"text": text, "intent": intent, "branch_id": branch_id}).decode())
+    except LLMUnavailable:
+        state["intent"], state["entities"] = _rule_based_fallback(text)
     except Exception:
         state["intent"] = "BROWSE"
         state["entities"] = {}
@@ -1,17 +1,33 @@
 """Bot nodes — menu_retrieval + response_formatter"""
 import uuid
+from langchain_core.runnables import RunnableConfig
 from app.bot.state import BotState
-from app.database import AsyncSessionLocal
-from app.models.menu import MenuCategory, MenuItem
-from sqlalchemy import select
+from app.bot.uow import bot_session
+from app.models.menu import MenuItem
+from app.bot.menu_search import menu_search
+from app.services.menu_snapshot import menu_snapshots, ItemView
 
 
 VEG_EMOJI = {"veg": "🟢", "nonveg": "🔴", "jain": "🌿"}
 SPICE_EMOJI = {"mild": "🌶", "medium": "🌶🌶", "hot": "🌶🌶🌶"}
 
 
-async def menu_retrieval(state: BotState) -> BotState:
-    """Fetch menu categories or items and prepare response payload."""
+async def menu_item(branch_id: str | None, item_id, config: RunnableConfig | None = None) -> ItemView | MenuItem | None:
+    """An item by id from the branch snapshot; the DB only for ids the snapshot doesn't know."""
+    try:
+        item_id = uuid.UUID(str(item_id))
+    except ValueError:
+        return None
+    if branch_id:
+        item = (await menu_snapshots.get(branch_id)).item(item_id)
+        if item is not None:
+            return item
+    async with bot_session(config) as db:
+        return await db.get(MenuItem, item_id)
+
+
+async def menu_retrieval(state: BotState, config: RunnableConfig | None = None) -> BotState:
+    """Fetch menu categories or items from the branch's menu snapshot and prepare response payload."""
     branch_id = state.get("branch_id")
     entities = state.get("entities", {})
     item_name_hint = (entities.get("item_name") or "").lower()
@@ -20,135 +36,107 @@ async def menu_retrieval(state: BotState) -> BotState:
         state["error"] = "no_branch_id"
         return state
 
-    async with AsyncSessionLocal() as db:
-        # 1. Show items for a specific category
-        cat_id = entities.get("category_id")
-        if cat_id:
-            try:
-                items_result = await db.execute(
-                    select(MenuItem).where(
-                        MenuItem.category_id == uuid.UUID(cat_id),
-                        MenuItem.is_available == True
-                    )
-                )
-                items = items_result.scalars().all()
-                if not items:
-                    state["final_response"] = {"type": "text", "body": "No items found in this category. 📋"}
-                    return state
-
-                rows = []
-                for item in items[:9]: # Show 9 items + 1 'Back' row
-                    veg = VEG_EMOJI["veg"] if item.is_veg else VEG_EMOJI["nonveg"]
-                    title = f"{veg} {item.name}"[:24]
-                    rows.append({
-                        "id": f"item_{item.id}",
-                        "title": title,
-                        "description": f"₹{item.base_price:.0f}",
-                    })
-                
-                # Navigation Link
-                rows.append({
-                    "id": "show_menu",
-                    "title": "🔙 All Categories",
-                    "description": "View other menu sections"
-                })
-
-                state["final_response"] = {
-                    "type": "list",
-                    "body": "Select an item to add to your cart: 👇",
-                    "button_label": "View Items",
-                    "sections": [{"title": "Category Items", "rows": rows}],
-                }
-                return state
-            except (ValueError, Exception) as e:
-                print(f"Error fetching category items: {e}")
-
-        # 2. Veg / Non-Veg search filter
-        is_veg_filter = entities.get("is_veg")
-        if is_veg_filter is not None:
-            items_result = await db.execute(
-                select(MenuItem).where(
-                    MenuItem.branch_id == uuid.UUID(branch_id),
-                    MenuItem.is_veg == is_veg_filter,
-                    MenuItem.is_available == True
-                )
-            )
-            items = items_result.scalars().all()
-            if not items:
-                state["final_response"] = {"type": "text", "body": f"Sorry, couldn't find any {'veg' if is_veg_filter else 'non-veg'} items content. 📋"}
-                return state
-
-            rows = []
-            for item in items[:10]:
-                veg = VEG_EMOJI["veg"] if item.is_veg else VEG_EMOJI["nonveg"]
-                title = f"{veg} {item.name}"[:24]
-                rows.append({"id": f"item_{item.id}", "title": title, "description": f"₹{item.base_price:.0f}"})
-            
-            state["final_response"] = {
-                "type": "list",
-                "body": f"Here are our {'Veg' if is_veg_filter else 'Non-Veg'} items: 👇",
-                "button_label": "View Items",
-                "sections": [{"title": "Filter Results", "rows": rows}],
-            }
+    menu = await menu_snapshots.get(branch_id)
+
+    # 1. Show items for a specific category
+    cat_id = entities.get("category_id")
+    if cat_id:
+        items = menu.category_items(cat_id)
+        if not items:
+            state["final_response"] = {"type": "text", "body": "No items found in this category. 📋"}
             return state
 
-        # 3. Fuzzy search for item hint
-        if item_name_hint:
-            items_result = await db.execute(
-                select(MenuItem).where(
-                    MenuItem.branch_id == uuid.UUID(branch_id),
-                    MenuItem.is_available == True,
-                )
-            )
-            all_items = items_result.scalars().all()
-            matched = [i for i in all_items if item_name_hint in i.name.lower()]
-            if not matched:
-                matched = all_items[:10]  # fallback: show first 10
-
-            if not matched:
-                state["final_response"] = {"type": "text", "body": "Sorry, no items are available at the moment. 📋"}
-                return state
-
-            rows = []
-            for item in matched[:10]:
-                veg = VEG_EMOJI["veg"] if item.is_veg else VEG_EMOJI["nonveg"]
-                spice = SPICE_EMOJI.get(item.spice_level, "") if item.spice_level else ""
-                title = f"{veg} {item.name}"[:24]
-                rows.append({
-                    "id": f"item_{item.id}",
-                    "title": title,
-                    "description": f"₹{item.base_price:.0f} {spice}",
-                })
-            state["final_response"] = {
-                "type": "list",
-                "body": "Here are the matching items 👇\nTap one to add it to cart:",
-                "button_label": "View Items",
-                "sections": [{"title": "Menu Items", "rows": rows}],
-            }
-        else:
-            # 4. Default: Show categories
-            cats_result = await db.execute(
-                select(MenuCategory).where(
-                    MenuCategory.branch_id == uuid.UUID(branch_id),
-                    MenuCategory.is_active == True,
-                ).order_by(MenuCategory.sort_order)
-            )
-            cats = cats_result.scalars().all()
-            if not cats:
-                state["final_response"] = {"type": "text", "body": "The menu is currently being updated. Please check back in a few minutes! 📋"}
-                return state
-
-            rows = [{"id": f"cat_{c.id}", "title": c.name[:24], "description": f"~{c.estimated_prep_minutes} min" if c.estimated_prep_minutes else ""} for c in cats[:10]]
-            state["final_response"] = {
-                "type": "list",
-                "body": "📋 Our Menu Categories — tap to browse:",
-                "button_label": "Browse Menu",
-                "sections": [{"title": "Categories", "rows": rows}],
-            }
+        rows = []
+        for item in items[:9]: # Show 9 items + 1 'Back' row
+            veg = VEG_EMOJI["veg"] if item.is_veg else VEG_EMOJI["nonveg"]
+            title = f"{veg} {item.name}"[:24]
+            rows.append({
+                "id": f"item_{item.id}",
+                "title": title,
+                "description": f"₹{item.base_price:.0f}",
+            })
+
+        # Navigation Link
+        rows.append({
+            "id": "show_menu",
+            "title": "🔙 All Categories",
+            "description": "View other menu sections"
+        })
+
+        state["final_response"] = {
+            "type": "list",
+            "body": "Select an item to add to your cart: 👇",
+            "button_label": "View Items",
+            "sections": [{"title": "Category Items", "rows": rows}],
+        }
+        return state
+
+    # 2. Veg / Non-Veg search filter
+    is_veg_filter = entities.get("is_veg")
+    if is_veg_filter is not None:
+        items = menu.items_by_veg(bool(is_veg_filter))
+        if not items:
+            state["final_response"] = {"type": "text", "body": f"Sorry, couldn't find any {'veg' if is_veg_filter else 'non-veg'} items content. 📋"}
+            return state
+
+        rows = []
+        for item in items[:10]:
+            veg = VEG_EMOJI["veg"] if item.is_veg else VEG_EMOJI["nonveg"]
+            title = f"{veg} {item.name}"[:24]
+            rows.append({"id": f"item_{item.id}", "title": title, "description": f"₹{item.base_price:.0f}"})
+
+        state["final_response"] = {
+            "type": "list",
+            "body": f"Here are our {'Veg' if is_veg_filter else 'Non-Veg'} items: 👇",
+            "button_label": "View Items",
+            "sections": [{"title": "Filter Results", "rows": rows}],
+        }
+        return state
+
+    # 3. Fuzzy search for item hint
+    if item_name_hint:
+        matched = [item for item, _ in await menu_search.search(branch_id, item_name_hint, k=10)]
+        if not matched:
+            matched = menu.available_items[:10]  # fallback: show first 10
+
+        if not matched:
+            state["final_response"] = {"type": "text", "body": "Sorry, no items are available at the moment. 📋"}
+            return state
+
+        rows = []
+        for item in matched[:10]:
+            veg = VEG_EMOJI["veg"] if item.is_veg else VEG_EMOJI["nonveg"]
+            spice = SPICE_EMOJI.get(item.spice_level, "") if item.spice_level else ""
+            title = f"{veg} {item.name}"[:24]
+            rows.append({
+                "id": f"item_{item.id}",
+                "title": title,
+                "description": f"₹{item.base_price:.0f} {spice}",
+            })
+        state["final_response"] = {
+            "type": "list",
+            "body": "Here are the matching items 👇\nTap one to add it to cart:",
+            "button_label": "View Items",
+            "sections": [{"title": "Menu Items", "rows": rows}],
+        }
+    else:
+        # 4. Default: Show categories
+        cats = menu.categories
+        if not cats:
+            state["final_response"] = {"type": "text", "body": "The menu is currently being updated. Please check back in a few minutes! 📋"}
+            return state
+
+        rows = [{"id": f"cat_{c.id}", "title": c.name[:24], "description": f"~{c.estimated_prep_minutes} min" if c.estimated_prep_minutes else ""} for c in cats[:10]]
+        state["final_response"] = {
+            "type": "list",
+            "body": "📋 Our Menu Categories — tap to browse:",
+            "button_label": "Browse Menu",
+            "sections": [{"title": "Categories", "rows": rows}],
+        }
     return state
 
 
-async def item_info_node(state: BotState) -> BotState:
+async def item_info_node(state: BotState, config: RunnableConfig | None = None) -> BotState:
     """Show item details and ask for quantity using buttons."""
     entities = state.get("entities", {})
     item_id = entities.get("item_id")
@@ -157,30 +145,27 @@ async def item_info_node(state: BotState) -> BotState:
         state["final_response"] = {"type": "text", "body": "Which item? Please select from the menu. 📋"}
         return state
 
-    async with AsyncSessionLocal() as db:
-        res = await db.execute(select(MenuItem).where(MenuItem.id == uuid.UUID(item_id)))
-        item = res.scalar_one_or_none()
-        
-        if not item:
-            state["final_response"] = {"type": "text", "body": "Item not found. 📋"}
-            return state
+    item = await menu_item(state.get("branch_id"), item_id, config)
+    if not item:
+        state["final_response"] = {"type": "text", "body": "Item not found. 📋"}
+        return state
 
-        veg = VEG_EMOJI["veg"] if item.is_veg else VEG_EMOJI["nonveg"]
-        body = (
-            f"*{veg} {item.name}*\n"
-            f"💰 Price: ₹{item.base_price:.0f}\n\n"
-            "How many portions would you like? 👇"
-        )
-        
-        state["final_response"] = {
-            "type": "buttons",
-            "body": body,
-            "buttons": [
-                {"id": f"qty_1_{item.id}", "title": "1 Portion"},
-                {"id": f"qty_2_{item.id}", "title": "2 Portions"},
-                {"id": f"qty_3_{item.id}", "title": "3 Portions"},
-            ]
-        }
+    veg = VEG_EMOJI["veg"] if item.is_veg else VEG_EMOJI["nonveg"]
+    body = (
+        f"*{veg} {item.name}*\n"
+        f"💰 Price: ₹{item.base_price:.0f}\n\n"
+        "How many portions would you like? 👇"
+    )
+
+    state["final_response"] = {
+        "type": "buttons",
+        "body": body,
+        "buttons": [
+            {"id": f"qty_1_{item.id}", "title": "1 Portion"},
+            {"id": f"qty_2_{item.id}", "title": "2 Portions"},
+            {"id": f"qty_3_{item.id}", "title": "3 Portions"},
+        ]
+    }
     return state
 
 
@@ -0,0 +1,82 @@
+"""WhatsApp webhook payload — parsed once from the raw request bytes into slotted records."""
+from dataclasses import dataclass, field
+
+import orjson
+
+
+class PayloadError(ValueError):
+    pass
+
+
+@dataclass(slots=True, frozen=True)
+class InboundMessage:
+    wa_message_id: str
+    wa_user_id: str       # sender's WhatsApp phone number
+    phone_number_id: str  # business number the message was sent to
+    message_type: str     # "text" | "interactive" | raw Meta type for anything else
+    text: str             # text body or button / list reply id
+    raw: dict             # the message object exactly as Meta sent it (not copied)
+
+
+@dataclass(slots=True, frozen=True)
+class StatusUpdate:
+    wa_message_id: str
+    status: str           # "sent" | "delivered" | "read" | "failed"
+    recipient_id: str
+
+
+@dataclass(slots=True)
+class WebhookBatch:
+    messages: list[InboundMessage] = field(default_factory=list)
+    statuses: list[StatusUpdate] = field(default_factory=list)
+
+
+def extract_text(msg: dict) -> tuple[str, str]:
+    """Returns (text, message_type)."""
+    msg_type = msg.get("type", "text")
+    if msg_type == "text":
+        return msg.get("text", {}).get("body", ""), "text"
+    elif msg_type == "interactive":
+        inter = msg.get("interactive", {})
+        if inter.get("type") == "button_reply":
+            return inter["button_reply"]["id"], "interactive"
+        elif inter.get("type") == "list_reply":
+            return inter["list_reply"]["id"], "interactive"
+    return "", msg_type
+
+
+def from_dict(payload: dict) -> WebhookBatch:
+    """Walk every entry / change of a decoded webhook body."""
+    batch = WebhookBatch()
+    for entry in payload.get("entry") or []:
+        for change in entry.get("changes") or []:
+            value = change.get("value") or {}
+            phone_number_id = (value.get("metadata") or {}).get("phone_number_id", "")
+            for st in value.get("statuses") or []:
+                batch.statuses.append(StatusUpdate(
+                    wa_message_id=st.get("id", ""),
+                    status=st.get("status", ""),
+                    recipient_id=st.get("recipient_id", ""),
+                ))
+            for msg in value.get("messages") or []:
+                text, msg_type = extract_text(msg)
+                batch.messages.append(InboundMessage(
+                    wa_message_id=msg.get("id", ""),
+                    wa_user_id=msg.get("from", ""),
+                    phone_number_id=phone_number_id,
+                    message_type=msg_type,
+                    text=text,
+                    raw=msg,
+                ))
+    return batch
+
+
+def parse_webhook(body: bytes) -> WebhookBatch:
+    """Decode the raw request body with orjson and build the typed batch."""
+    try:
+        payload = orjson.loads(body)
+    except orjson.JSONDecodeError as e:
+        raise PayloadError(str(e))
+    if not isinstance(payload, dict):
+        raise PayloadError("Webhook body is not a JSON object")
+    return from_dict(payload)
@@ -0,0 +1,78 @@
+"""Restaurant chat context — the system prompt restaurant_chat sends, built once per (restaurant, branch)."""
+import time
+import uuid
+from dataclasses import dataclass
+
+from langchain_core.runnables import RunnableConfig
+
+from app.bot.uow import bot_session
+from app.config import settings
+from app.models.tenancy import Restaurant, Branch
+from app.services import metrics
+
+SYSTEM_PROMPT = """You are a helpful, friendly, and professional AI assistant for {restaurant_name}.
+{branch_info}
+
+Guidelines:
+1. Answer questions about the restaurant, its food, culture, and services.
+2. If asked about ratings or staff, be polite and say we strive for excellence.
+3. Keep answers concise (max 2-3 sentences).
+4. Do NOT make up specific menu prices if you don't have them, but you can say we have a variety of items.
+5. If the user wants to order, guide them to say "show menu" or "list items".
+6. Use emojis to be friendly.
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class RestaurantContext:
+    restaurant_name: str
+    branch_info: str
+    system_prompt: str
+    loaded_at: float
+
+
+class RestaurantContextCache:
+    """In-process cache with a TTL; the admin routes invalidate it when a restaurant or branch changes."""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._entries: dict[tuple[str, str | None], RestaurantContext] = {}
+
+    async def get(self, restaurant_id: str, branch_id: str | None, config: RunnableConfig | None = None) -> RestaurantContext:
+        key = (str(restaurant_id), str(branch_id) if branch_id else None)
+        ctx = self._entries.get(key)
+        if ctx is not None and time.monotonic() - ctx.loaded_at < self.ttl_seconds:
+            metrics.incr("chat_context.hits")
+            return ctx
+        metrics.incr("chat_context.misses")
+
+        async with bot_session(config) as db:
+            restaurant = await db.get(Restaurant, uuid.UUID(key[0]))
+            branch = await db.get(Branch, uuid.UUID(key[1])) if key[1] else None
+
+        restaurant_name = restaurant.name if restaurant else "our restaurant"
+        branch_info = ""
+        if branch:
+            branch_info = f"This branch is located at {branch.address}, {branch.city}, {branch.state} - {branch.pincode}."
+        ctx = RestaurantContext(
+            restaurant_name=restaurant_name,
+            branch_info=branch_info,
+            system_prompt=SYSTEM_PROMPT.format(restaurant_name=restaurant_name, branch_info=branch_info),
+            loaded_at=time.monotonic(),
+        )
+        if restaurant is not None:
+            self._entries[key] = ctx
+        return ctx
+
+    def invalidate(self, restaurant_id: str | uuid.UUID, branch_id: str | uuid.UUID | None = None):
+        """Drop one branch's context, or every context of the restaurant when no branch is given."""
+        restaurant_id = str(restaurant_id)
+        for key in [k for k in self._entries if k[0] == restaurant_id]:
+            if branch_id is None or key[1] == str(branch_id):
+                del self._entries[key]
+
+    def clear(self):
+        self._entries.clear()
+
+
+restaurant_contexts = RestaurantContextCache(ttl_seconds=settings.CHAT_CONTEXT_TTL_SECONDS)
@@ -0,0 +1,76 @@
+"""Speculative intent — classify free text while resolve_session is still talking to the database.
+
+Classification only needs the message text and the branch, so the webhook
+starts it before invoking the graph and passes it in the config; intent_router
+joins it. The branch comes from the session cache's local tier. Unknown senders
+and phrasings already in the local intent cache are not speculated on. The task
+itself checks the shared intent cache before it calls Gemini. If resolve_session
+ends the run early (no_session, invalid_token, ...) or lands on another branch,
+nobody joins and the webhook discards it, which cancels the Gemini call.
+"""
+import asyncio
+from dataclasses import dataclass
+
+from langchain_core.runnables import RunnableConfig
+
+from app.bot.intent_cache import intent_cache
+from app.bot.payload import InboundMessage
+from app.services import metrics
+from app.services.session_cache import session_cache
+
+
+@dataclass(slots=True)
+class Speculation:
+    branch_id: str                                # from the cached session; intent_router checks it
+    local: tuple[str, dict | None] | None = None  # resolved without Gemini
+    task: asyncio.Task | None = None              # (intent, entities, from_cache): intent cache, then Gemini
+
+
+def start(inbound: InboundMessage, restaurant_id: str) -> Speculation | None:
+    """None when there is nothing to gain.
+
+    That covers QR pairing, empty text, a sender with no locally cached session,
+    and a phrasing already in the local intent cache.
+    """
+    from app.bot.nodes.intent import local_intent
+
+    text = inbound.text or ""
+    if not text or "HELLODINE_START" in text.upper():
+        return None
+    ctx = session_cache.peek(restaurant_id, inbound.wa_user_id)
+    if ctx is None:
+        return None
+    local = local_intent(text)
+    if local is not None:
+        return Speculation(branch_id=ctx.branch_id, local=local)
+    if intent_cache.peek(ctx.branch_id, text) is not None:
+        return None
+    metrics.incr("intent.speculative_started")
+    return Speculation(branch_id=ctx.branch_id, task=asyncio.create_task(_classify(text, ctx.branch_id, restaurant_id)))
+
+
+async def _classify(text: str, branch_id: str, restaurant_id: str) -> tuple[str, dict, bool]:
+    from app.bot.nodes.intent import llm_classify
+
+    # The Redis tier may still have it (another worker already paid for this phrasing)
+    cached = await intent_cache.get(branch_id, text)
+    if cached is not None:
+        return cached[0], cached[1], True
+    intent, entities = await llm_classify(text, restaurant_id)
+    return intent, entities, False
+
+
+def pending(config: RunnableConfig | None) -> Speculation | None:
+    return ((config or {}).get("configurable") or {}).get("speculation")
+
+
+def discard(speculation: Speculation | None):
+    """Cancel a Gemini classification nobody will read (no-op once it has been joined)."""
+    if speculation is None or speculation.task is None:
+        return
+    task = speculation.task
+    if not task.done():
+        task.cancel()
+        metrics.incr("intent.speculative_discarded")
+    elif not task.cancelled():
+        task.exception()  # joined or not, don't leave "exception was never retrieved" behind
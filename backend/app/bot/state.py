@@ -14,7 +14,8 @@ class BotState(TypedDict, total=False):
     preferred_language: str  # "en" | "hi"
 
     # Message context
-    raw_message: dict     # full parsed WA payload
+    inbound: Any          # payload.InboundMessage parsed once by the webhook
+    raw_message: dict     # full parsed WA payload (used when `inbound` is not set)
     message_text: str     # extracted text / button reply id
     message_type: str     # "text" | "interactive"
 
@@ -0,0 +1,141 @@
+"""Bot tracing — per-node timings for every graph run, per-intent histograms and recent traces."""
+import functools
+import logging
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Mapping
+
+import orjson
+
+from app.config import settings
+from app.services import metrics
+
+logger = logging.getLogger("app.bot.trace")
+
+_current: ContextVar["BotTrace | None"] = ContextVar("bot_trace", default=None)
+
+# Most recent finished traces, newest last
+recent: deque["BotTrace"] = deque(maxlen=settings.BOT_TRACE_BUFFER)
+
+# Intents route_after_intent knows; anything else Gemini returns is bucketed as UNKNOWN
+# so a hallucinated label can't mint new metric keys
+KNOWN_INTENTS = frozenset({
+    "QR_SCAN", "BROWSE", "ITEM_INFO", "ADD_ITEM", "REMOVE_ITEM", "UPDATE_QTY", "CART_VIEW",
+    "CONFIRM_SUMMARY", "PLACE_ORDER", "BILL", "OTHER",
+})
+
+
+@dataclass(slots=True)
+class BotTrace:
+    restaurant_id: str
+    wa_message_id: str
+    started: float = field(default_factory=time.perf_counter)
+    at: float = field(default_factory=time.time)
+    spans: list[tuple[str, float]] = field(default_factory=list)  # (node, seconds) in run order
+    intent: str | None = None
+    error: str | None = None
+    graph_seconds: float | None = None
+    send_seconds: float | None = None
+    send_attempts: int = 0
+    send_status: str | None = None  # "sent" | "dead_lettered" | None (no reply)
+    path: str = "graph"             # "graph" | "fast" (interactive reply dispatched directly)
+
+    def to_dict(self) -> dict:
+        return {
+            "restaurant_id": self.restaurant_id,
+            "wa_message_id": self.wa_message_id,
+            "at": self.at,
+            "path": self.path,
+            "intent": self.intent,
+            "error": self.error,
+            "nodes": [{"node": name, "ms": round(sec * 1000, 2)} for name, sec in self.spans],
+            "graph_ms": _ms(self.graph_seconds),
+            "send_ms": _ms(self.send_seconds),
+            "send_attempts": self.send_attempts,
+            "send_status": self.send_status,
+        }
+
+
+def _metric_intent(intent: str | None) -> str:
+    return intent if intent in KNOWN_INTENTS else "UNKNOWN"
+
+
+def _ms(seconds: float | None) -> float | None:
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+def start(restaurant_id: str, wa_message_id: str) -> BotTrace:
+    """Begin a trace for one graph invocation in the current task."""
+    trace = BotTrace(restaurant_id=restaurant_id, wa_message_id=wa_message_id)
+    _current.set(trace)
+    return trace
+
+
+def finish(trace: BotTrace, result: Mapping[str, Any] | None = None):
+    """Close the graph part of the trace and feed the per-node, per-intent histograms."""
+    trace.graph_seconds = time.perf_counter() - trace.started
+    if result is not None:
+        trace.intent = result.get("intent") or trace.intent
+        trace.error = result.get("error") or trace.error
+    intent = _metric_intent(trace.intent)
+    for name, seconds in trace.spans:
+        metrics.latency(f"bot.node.{name}.{intent}").observe(seconds)
+    metrics.latency(f"bot.graph.{intent}").observe(trace.graph_seconds)
+    recent.append(trace)
+
+
+def record_send(trace: BotTrace, seconds: float | None, attempts: int, status: str):
+    """Attach the WhatsApp send to the trace and emit it (called by the outbound dispatcher)."""
+    trace.send_seconds = seconds
+    trace.send_attempts = attempts
+    trace.send_status = status
+    if seconds is not None:
+        metrics.latency(f"bot.send.{_metric_intent(trace.intent)}").observe(seconds)
+    emit(trace)
+
+
+def emit(trace: BotTrace):
+    """One structured `bot.trace` log line per processed message."""
+    if settings.BOT_TRACE_LOG and logger.isEnabledFor(logging.INFO):
+        logger.info("bot.trace %s", orjson.dumps(trace.to_dict()).decode())
+
+
+def timed_node(name: str, fn):
+    """Wrap a graph node so its duration is recorded globally and on the current trace."""
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.latency(f"bot.node.{name}").observe(elapsed)
+            trace = _current.get()
+            if trace is not None:
+                trace.spans.append((name, elapsed))
+
+    return wrapper
+
+
+def node_latency() -> dict:
+    """{node: {"all": window, INTENT: window, ...}} from the `bot.node.*` histograms."""
+    out: dict[str, dict] = {}
+    for key, snap in metrics.latencies("bot.node.").items():
+        node, _, intent = key.partition(".")
+        out.setdefault(node, {})[intent or "all"] = snap
+    return out
+
+
+def recent_traces(limit: int = 50, slower_than_ms: float = 0) -> list[dict]:
+    """Newest first; optionally only runs whose graph time exceeded `slower_than_ms`."""
+    out = []
+    for trace in reversed(recent):
+        if slower_than_ms and (trace.graph_seconds or 0) * 1000 < slower_than_ms:
+            continue
+        out.append(trace.to_dict())
+        if len(out) >= limit:
+            break
+    return out
@@ -0,0 +1,42 @@
+"""Bot unit of work — one AsyncSession per graph invocation, shared by every node through the config."""
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from langchain_core.runnables import RunnableConfig
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import AsyncSessionLocal
+
+
+def graph_config(db: AsyncSession, **configurable) -> RunnableConfig:
+    """Config passed to `compiled_graph.ainvoke` so nodes reuse `db` and its identity map."""
+    return {"configurable": {"db": db, **configurable}}
+
+
+def shared_session(config: RunnableConfig | None) -> AsyncSession | None:
+    return ((config or {}).get("configurable") or {}).get("db")
+
+
+@asynccontextmanager
+async def bot_session(config: RunnableConfig | None) -> AsyncIterator[AsyncSession]:
+    """The invocation's session if there is one, else a short-lived session of our own.
+
+    The shared session is owned (and closed) by the caller of `ainvoke`; nodes only
+    commit where they write, so rows loaded by earlier nodes stay in the identity map.
+    """
+    db = shared_session(config)
+    if db is not None:
+        yield db
+        return
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def release(config: RunnableConfig | None):
+    """End the open transaction so the pooled connection isn't held across a slow call (e.g. Gemini).
+
+    Commits rather than rolls back: with expire_on_commit=False the loaded objects stay usable.
+    """
+    db = shared_session(config)
+    if db is not None and db.in_transaction():
+        await db.commit()
@@ -1,7 +1,71 @@
 """WhatsApp Cloud API outbound message sender."""
+import importlib.util
+import logging
 import httpx
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
+# Meta error codes that mean "slow down / try again", even when the HTTP status is 400
+RETRYABLE_META_CODES = {4, 80007, 130429, 131000, 131016, 131048, 131056, 133004}
+
+
+class WhatsAppAPIError(Exception):
+    def __init__(self, status_code: int, body: dict | None = None):
+        self.status_code = status_code
+        self.body = body or {}
+        error = self.body.get("error", {}) if isinstance(self.body, dict) else {}
+        self.code = error.get("code")
+        super().__init__(f"WhatsApp API {status_code}: {error.get('message') or self.body}")
+
+    @property
+    def retryable(self) -> bool:
+        return self.status_code == 429 or self.status_code >= 500 or self.code in RETRYABLE_META_CODES
+
+
+# One pooled keep-alive client for the whole process (opened / closed in main.lifespan)
+_client: httpx.AsyncClient | None = None
+
+
+def _build_client(transport: httpx.AsyncBaseTransport | None = None) -> httpx.AsyncClient:
+    http2 = settings.WA_HTTP2
+    if http2 and importlib.util.find_spec("h2") is None:
+        logger.warning("WA_HTTP2 is enabled but the 'h2' package is not installed; using HTTP/1.1")
+        http2 = False
+    return httpx.AsyncClient(
+        http2=http2,
+        transport=transport,
+        limits=httpx.Limits(
+            max_connections=settings.WA_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.WA_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.WA_HTTP_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(settings.WA_HTTP_TIMEOUT, connect=settings.WA_HTTP_CONNECT_TIMEOUT),
+    )
+
+
+async def start_client(transport: httpx.AsyncBaseTransport | None = None):
+    """Open the shared client. Pass a transport (e.g. httpx.MockTransport) to stub Meta in tests and benchmarks."""
+    global _client
+    await close_client()
+    _client = _build_client(transport)
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """Shared client; created lazily for scripts that run outside the app lifespan."""
+    global _client
+    if _client is None:
+        _client = _build_client()
+    return _client
+
+
 def get_whatsapp_url(phone_number_id: str):
     return f"{settings.WA_API_URL}/{phone_number_id}/messages"
 
@@ -12,11 +76,30 @@ def get_headers(access_token: str):
     }
 
 
+async def _post(payload: dict, phone_number_id: str, access_token: str):
+    resp = await get_client().post(get_whatsapp_url(phone_number_id), json=payload, headers=get_headers(access_token))
+    try:
+        body = resp.json()
+    except ValueError:
+        body = {}
+    if resp.status_code >= 400:
+        raise WhatsAppAPIError(resp.status_code, body)
+    return body
+
+
+async def send_response(to: str, response: dict, phone_number_id: str, access_token: str):
+    """Send a bot `final_response` dict ({"type": "text|buttons|list", ...})."""
+    msg_type = response.get("type", "text")
+    if msg_type == "buttons":
+        return await send_interactive_buttons(to, response["body"], response["buttons"], phone_number_id, access_token)
+    if msg_type == "list":
+        return await send_interactive_list(to, response["body"], response.get("button_label", "View"), response["sections"], phone_number_id, access_token)
+    return await send_text(to, response["body"], phone_number_id, access_token)
+
+
 async def send_text(to: str, text: str, phone_number_id: str, access_token: str):
     payload = {"messaging_product": "whatsapp", "to": to, "type": "text", "text": {"body": text}}
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(get_whatsapp_url(phone_number_id), json=payload, headers=get_headers(access_token))
-        return resp.json()
+    return await _post(payload, phone_number_id, access_token)
 
 
 async def send_interactive_buttons(to: str, body: str, buttons: list[dict], phone_number_id: str, access_token: str):
@@ -36,9 +119,7 @@ async def send_interactive_buttons(to: str, body: str, buttons: list[dict], phon
             },
         },
     }
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(get_whatsapp_url(phone_number_id), json=payload, headers=get_headers(access_token))
-        return resp.json()
+    return await _post(payload, phone_number_id, access_token)
 
 
 async def send_interactive_list(to: str, body: str, button_label: str, sections: list[dict], phone_number_id: str, access_token: str):
@@ -56,9 +137,7 @@ async def send_interactive_list(to: str, body: str, button_label: str, sections:
             },
         },
     }
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(get_whatsapp_url(phone_number_id), json=payload, headers=get_headers(access_token))
-        return resp.json()
+    return await _post(payload, phone_number_id, access_token)
 
 
 async def send_template(to: str, template_name: str, language_code: str, phone_number_id: str, access_token: str):
@@ -72,8 +151,5 @@ async def send_template(to: str, template_name: str, language_code: str, phone_n
             "language": {"code": language_code}
         }
     }
-    async with httpx.AsyncClient() as client:
-        url = get_whatsapp_url(phone_number_id)
-        headers = get_headers(access_token)
-        resp = await client.post(url, json=payload, headers=headers)
-        return resp.json()
+    return await _post(payload, phone_number_id, access_token)
+
@@ -25,9 +25,88 @@ class Settings(BaseSettings):
     WA_APP_ID: str = ""
     WA_APP_SECRET: str = ""
     WA_API_URL: str = "https://graph.facebook.com/v22.0"
+    WA_HTTP2: bool = False  # needs the optional `h2` package
+    WA_HTTP_MAX_CONNECTIONS: int = 100
+    WA_HTTP_MAX_KEEPALIVE: int = 20
+    WA_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    WA_HTTP_TIMEOUT: float = 10.0
+    WA_HTTP_CONNECT_TIMEOUT: float = 5.0
+
+    # Outbound replies — token bucket per phone_number_id, retry with backoff, dead letters
+    OUTBOUND_RATE_PER_SECOND: float = 60.0
+    OUTBOUND_BURST: float = 80.0
+    OUTBOUND_MAX_CONCURRENCY: int = 50
+    OUTBOUND_MAX_PENDING: int = 10_000
+    OUTBOUND_MAX_ATTEMPTS: int = 5
+    OUTBOUND_BACKOFF_BASE_SECONDS: float = 0.5
+    OUTBOUND_BACKOFF_MAX_SECONDS: float = 30.0
+    OUTBOUND_DEAD_LETTER_SIZE: int = 500
+    OUTBOUND_LOG_FLUSH_INTERVAL_MS: int = 250
+    OUTBOUND_LOG_FLUSH_MAX_ROWS: int = 200
+    OUTBOUND_LOG_MAX_BUFFERED: int = 20_000
+    TENANT_CACHE_TTL_SECONDS: float = 300.0
+    WEBHOOK_LOG_SAMPLE_RATE: float = 0.01  # fraction of bodies logged at DEBUG
+    WEBHOOK_LOG_MAX_BYTES: int = 2048
 
     # Gemini
     GEMINI_API_KEY: str = ""
+    LLM_MAX_CONCURRENCY: int = 32
+    LLM_MAX_CONCURRENCY_PER_RESTAURANT: int = 8
+    LLM_INTENT_TIMEOUT_SECONDS: float = 4.0   # deadline incl. waiting for a concurrency slot
+    LLM_CHAT_TIMEOUT_SECONDS: float = 8.0
+    LLM_BREAKER_FAILURES: int = 5             # consecutive failures before failing fast
+    LLM_BREAKER_COOLDOWN_SECONDS: float = 30.0
+    LLM_SINGLE_FLIGHT: bool = True            # identical in-flight prompts share one Gemini call
+
+    # Bot processing — ack the webhook first, run the graph on background workers
+    BOT_ASYNC_WEBHOOK: bool = False
+    BOT_WORKERS: int = 8
+    BOT_QUEUE_SIZE: int = 1000
+    BOT_SHUTDOWN_GRACE_SECONDS: float = 10.0
+    DEDUP_CACHE_SIZE: int = 50_000
+    BOT_TRACE_BUFFER: int = 500   # recent per-message traces kept for /api/ops/traces
+    BOT_TRACE_LOG: bool = True    # one structured `bot.trace` log line per message
+
+    # Delivery status callbacks — flushed in batches, never routed through the graph
+    STATUS_FLUSH_INTERVAL_MS: int = 500
+    STATUS_FLUSH_MAX_ROWS: int = 500
+    STATUS_FLUSH_MAX_ATTEMPTS: int = 3
+
+    # Table session activity — last_message_at kept in memory, flushed in batches
+    SESSION_ACTIVITY_FLUSH_INTERVAL_MS: int = 5000
+    SESSION_ACTIVITY_FLUSH_MAX_ROWS: int = 1000
+    SESSION_ACTIVITY_MAX_TRACKED: int = 100_000
+
+    # Active session cache — (restaurant_id, wa_user_id) → open session context
+    SESSION_CACHE_MAX_ENTRIES: int = 50_000
+    SESSION_CACHE_TTL_SECONDS: float = 900.0
+    SESSION_CACHE_LOCAL_TTL_SECONDS: float = 30.0  # local copy lifetime when the Redis tier is on
+    SESSION_CACHE_REDIS: bool = False              # share the cache across workers via REDIS_URL
+
+    # Local intent classifier (app/bot/data/intent_model.json) — Gemini only below the threshold
+    INTENT_CLASSIFIER_ENABLED: bool = True
+    INTENT_CLASSIFIER_THRESHOLD: float = 0.8
+    BOT_SPECULATIVE_INTENT: bool = True  # start Gemini classification in parallel with resolve_session
+
+    # Intent cache — normalised text → Gemini-resolved (intent, entities), per branch
+    INTENT_CACHE_MAX_ENTRIES: int = 20_000
+    INTENT_CACHE_TTL_SECONDS: float = 86_400.0
+    INTENT_CACHE_REDIS: bool = False
+
+    # Restaurant chat — cached prompt context and FAQ answers, Gemini only on a miss
+    CHAT_CONTEXT_TTL_SECONDS: float = 300.0  # other workers' edits show up within this
+    FAQ_MATCH_THRESHOLD: float = 0.55        # IDF-weighted word overlap needed to answer locally (eval_faq_match.py)
+    FAQ_WRITE_BACK: bool = False             # store Gemini answers as FAQ entries (source="llm")
+
+    # Menu snapshots — per-branch in-process menu for the bot, rebuilt on menu writes
+    MENU_SNAPSHOT_TTL_SECONDS: float = 300.0  # other workers' menu edits show up within this
+    MENU_SEARCH_MIN_SCORE: float = 0.55       # fuzzy item-name match needed to count as a hit
+    MENU_HTTP_CACHE_MAX_ENTRIES: int = 5000   # serialized menu GET bodies (ETag / 304)
+    MENU_HTTP_MAX_AGE_SECONDS: int = 0        # 0 = browsers revalidate every poll with If-None-Match
+
+    # Redis (optional cache tiers)
+    REDIS_SOCKET_TIMEOUT: float = 0.25
+    REDIS_RETRY_SECONDS: float = 30.0
 
 
 settings = Settings()
@@ -5,7 +5,15 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.database import engine, Base
 import app.models  # ensure all models are registered before create_all
 
-from app.routers import auth, restaurant, menu, cart, orders, billing, webhook
+from app.routers import auth, restaurant, menu, cart, orders, billing, webhook, ops
+from app.config import settings
+from app.services.bot_worker import bot_pool
+from app.services.status_buffer import status_buffer
+from app.bot import wa_sender
+from app.services.outbound import dispatcher
+from app.services.message_log_writer import message_log_writer
+from app.services.session_activity import session_activity
+from app.services.redis_client import close_redis
 
 
 import logging
@@ -21,7 +29,20 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Application starting up...")
+    await wa_sender.start_client()
+    if settings.BOT_ASYNC_WEBHOOK:
+        bot_pool.start()
+    status_buffer.start()
+    message_log_writer.start()
+    session_activity.start()
     yield
+    await bot_pool.stop(settings.BOT_SHUTDOWN_GRACE_SECONDS)
+    await dispatcher.stop(settings.BOT_SHUTDOWN_GRACE_SECONDS)
+    await message_log_writer.stop()
+    await session_activity.stop()
+    await status_buffer.stop()
+    await wa_sender.close_client()
+    await close_redis()
 
 
 app = FastAPI(
@@ -51,6 +72,7 @@ app.include_router(cart.router)
 app.include_router(orders.router)
 app.include_router(billing.router)
 app.include_router(webhook.router)
+app.include_router(ops.router)
 
 
 @app.get("/")
@@ -6,6 +6,7 @@ from app.models.cart import Cart, CartItem, CartItemModifier, CartStatus
 from app.models.orders import Order, OrderItem, OrderItemModifier, OrderStatus
 from app.models.billing import Bill, Payment, BillStatus, PaymentMethod, PaymentStatus
 from app.models.logs import WhatsAppMessageLog, MessageDirection, DeliveryStatus
+from app.models.faq import RestaurantFAQ
 
 __all__ = [
     "Restaurant", "Branch", "Table", "TableQRToken",
@@ -16,4 +17,5 @@ __all__ = [
     "Order", "OrderItem", "OrderItemModifier", "OrderStatus",
     "Bill", "Payment", "BillStatus", "PaymentMethod", "PaymentStatus",
     "WhatsAppMessageLog", "MessageDirection", "DeliveryStatus",
+    "RestaurantFAQ",
 ]
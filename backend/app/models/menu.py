@@ -3,8 +3,8 @@ import uuid
 from datetime import datetime
 import enum
 from sqlalchemy import (
-    Boolean, CheckConstraint, DateTime, Enum, ForeignKey,
-    Integer, Numeric, Text, ARRAY, String, func
+    DDL, Boolean, CheckConstraint, DateTime, Enum, ForeignKey, Index,
+    Integer, Numeric, Text, ARRAY, String, event, func
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -34,6 +34,13 @@ class MenuItem(Base):
     __tablename__ = "menu_items"
     __table_args__ = (
         CheckConstraint("gst_percent IN (0, 5, 12, 18)", name="ck_gst_slabs"),
+        Index("ix_menu_items_branch_id", "branch_id"),
+        # Trigram indexes for /api/menu/search (pg_trgm; see migrate_menu_search.py)
+        Index("ix_menu_items_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index(
+            "ix_menu_items_description_trgm", "description",
+            postgresql_using="gin", postgresql_ops={"description": "gin_trgm_ops"},
+        ),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -58,6 +65,10 @@ class MenuItem(Base):
     modifier_groups: Mapped[list["MenuModifierGroup"]] = relationship("MenuModifierGroup", back_populates="item")
 
 
+# create_all on a fresh database needs the extension before the trigram indexes
+event.listen(MenuItem.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+
 class MenuItemVariant(Base):
     __tablename__ = "menu_item_variants"
 
@@ -15,6 +15,8 @@ from app.models.orders import Order, OrderStatus
 from app.models.customers import TableSession, SessionStatus
 from app.models.auth import StaffUser, StaffRole
 from app.services.auth_service import get_current_staff
+from app.services.session_activity import session_activity
+from app.services.session_cache import session_cache
 
 router = APIRouter(prefix="/api/billing", tags=["billing"])
 
@@ -102,6 +104,8 @@ async def pay_bill(bill_id: uuid.UUID, data: PayRequest, db: AsyncSession = Depe
     sess.closed_at = datetime.now(timezone.utc)
 
     await db.commit()
+    session_activity.forget(sess.id)
+    await session_cache.invalidate_session(sess.id)
     return {"ok": True, "bill_number": bill.bill_number, "amount_paid": data.amount}
 
 
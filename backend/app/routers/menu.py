@@ -1,14 +1,18 @@
 """Menu router — /api/menu"""
 import uuid
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func, or_, literal
 from sqlalchemy.orm import selectinload
 from pydantic import BaseModel
 from typing import Optional
 
 from app.database import get_db
 from app.models.menu import MenuCategory, MenuItem, MenuItemVariant, MenuModifierGroup, MenuModifier, SpiceLevel
+from app.services.menu_snapshot import menu_snapshots
+from app.services.menu_http_cache import menu_responses
+from app.bot.menu_search import transliterate
 
 router = APIRouter(prefix="/api/menu", tags=["menu"])
 
@@ -56,6 +60,11 @@ class ModifierCreate(BaseModel):
     price_delta: float = 0
 
 
+async def _item_branch(item_id: uuid.UUID, db: AsyncSession) -> uuid.UUID | None:
+    item = await db.get(MenuItem, item_id)
+    return item.branch_id if item else None
+
+
 # ─── Categories ───────────────────────────────────────────────────────────────
 @router.post("/categories")
 async def create_category(data: CategoryCreate, db: AsyncSession = Depends(get_db)):
@@ -63,15 +72,21 @@ async def create_category(data: CategoryCreate, db: AsyncSession = Depends(get_d
     db.add(cat)
     await db.commit()
     await db.refresh(cat)
+    menu_snapshots.invalidate(cat.branch_id)
     return cat
 
 
 @router.get("/categories")
-async def list_categories(branch_id: uuid.UUID, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(
-        select(MenuCategory).where(MenuCategory.branch_id == branch_id, MenuCategory.is_active == True).order_by(MenuCategory.sort_order)
-    )
-    return result.scalars().all()
+async def list_categories(branch_id: uuid.UUID, request: Request, db: AsyncSession = Depends(get_db)):
+    key = ("categories", branch_id)
+    cached = menu_responses.get(key)
+    if cached is None:
+        version = menu_snapshots.version(branch_id)
+        result = await db.execute(
+            select(MenuCategory).where(MenuCategory.branch_id == branch_id, MenuCategory.is_active == True).order_by(MenuCategory.sort_order)
+        )
+        cached = menu_responses.put(key, branch_id, version, result.scalars().all())
+    return menu_responses.respond(request, cached)
 
 
 @router.patch("/categories/{cat_id}")
@@ -84,6 +99,7 @@ async def update_category(cat_id: uuid.UUID, data: dict, db: AsyncSession = Depe
         if hasattr(cat, k):
             setattr(cat, k, v)
     await db.commit()
+    menu_snapshots.invalidate(cat.branch_id)
     return cat
 
 
@@ -94,28 +110,90 @@ async def create_item(data: ItemCreate, db: AsyncSession = Depends(get_db)):
     db.add(item)
     await db.commit()
     await db.refresh(item)
+    menu_snapshots.invalidate(item.branch_id)
     return item
 
 
 @router.get("/items")
-async def list_items(branch_id: uuid.UUID, category_id: Optional[uuid.UUID] = None, db: AsyncSession = Depends(get_db)):
-    q = select(MenuItem).where(MenuItem.branch_id == branch_id)
+async def list_items(branch_id: uuid.UUID, request: Request, category_id: Optional[uuid.UUID] = None, db: AsyncSession = Depends(get_db)):
+    key = ("items", branch_id, category_id)
+    cached = menu_responses.get(key)
+    if cached is None:
+        version = menu_snapshots.version(branch_id)
+        q = select(MenuItem).where(MenuItem.branch_id == branch_id)
+        if category_id:
+            q = q.where(MenuItem.category_id == category_id)
+        result = await db.execute(q.options(selectinload(MenuItem.variants), selectinload(MenuItem.modifier_groups)))
+        cached = menu_responses.put(key, branch_id, version, result.scalars().all())
+    return menu_responses.respond(request, cached)
+
+
+@router.get("/search")
+async def search_items(
+    branch_id: uuid.UUID,
+    q: str = Query(..., min_length=1, max_length=100),
+    category_id: Optional[uuid.UUID] = None,
+    is_veg: Optional[bool] = None,
+    is_jain: Optional[bool] = None,
+    spice_level: Optional[SpiceLevel] = None,
+    is_available: Optional[bool] = True,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+):
+    """Ranked item search on name / description (pg_trgm: typos, partial words; Devanagari is transliterated)."""
+    term = transliterate(q.strip().lower())
+    pattern = "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    description = func.coalesce(MenuItem.description, "")
+    score = func.greatest(
+        func.similarity(MenuItem.name, term),
+        func.word_similarity(term, MenuItem.name),
+        func.word_similarity(term, description) * 0.5,  # description hits rank below name hits
+    ).label("score")
+
+    # Each branch of the OR can use a trigram GIN index
+    query = select(MenuItem, score).where(
+        MenuItem.branch_id == branch_id,
+        or_(
+            MenuItem.name.ilike(pattern),
+            MenuItem.name.op("%")(term),
+            literal(term).op("<%")(MenuItem.name),
+            MenuItem.description.ilike(pattern),
+        ),
+    )
     if category_id:
-        q = q.where(MenuItem.category_id == category_id)
-    result = await db.execute(q.options(selectinload(MenuItem.variants), selectinload(MenuItem.modifier_groups)))
-    return result.scalars().all()
+        query = query.where(MenuItem.category_id == category_id)
+    if is_veg is not None:
+        query = query.where(MenuItem.is_veg == is_veg)
+    if is_jain is not None:
+        query = query.where(MenuItem.is_jain == is_jain)
+    if spice_level is not None:
+        query = query.where(MenuItem.spice_level == spice_level)
+    if is_available is not None:
+        query = query.where(MenuItem.is_available == is_available)
+
+    result = await db.execute(query.order_by(score.desc(), MenuItem.name).limit(limit))
+    return [
+        {**jsonable_encoder(item), "score": round(float(item_score), 4)}
+        for item, item_score in result.all()
+    ]
 
 
 @router.get("/items/{item_id}")
-async def get_item(item_id: uuid.UUID, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(
-        select(MenuItem).where(MenuItem.id == item_id)
-        .options(selectinload(MenuItem.variants), selectinload(MenuItem.modifier_groups).selectinload(MenuModifierGroup.modifiers))
-    )
-    item = result.scalar_one_or_none()
-    if not item:
-        raise HTTPException(404, "Item not found")
-    return item
+async def get_item(item_id: uuid.UUID, request: Request, db: AsyncSession = Depends(get_db)):
+    key = ("item", item_id)
+    cached = menu_responses.get(key)
+    if cached is None:
+        # The branch (and so its version) is only known once the item is loaded; a write
+        # racing this read goes unseen for at most the TTL
+        result = await db.execute(
+            select(MenuItem).where(MenuItem.id == item_id)
+            .options(selectinload(MenuItem.variants), selectinload(MenuItem.modifier_groups).selectinload(MenuModifierGroup.modifiers))
+        )
+        item = result.scalar_one_or_none()
+        if not item:
+            raise HTTPException(404, "Item not found")
+        cached = menu_responses.put(key, item.branch_id, menu_snapshots.version(item.branch_id), item)
+    return menu_responses.respond(request, cached)
 
 
 @router.patch("/items/{item_id}")
@@ -128,6 +206,7 @@ async def update_item(item_id: uuid.UUID, data: dict, db: AsyncSession = Depends
         if hasattr(item, k):
             setattr(item, k, v)
     await db.commit()
+    menu_snapshots.invalidate(item.branch_id)
     return item
 
 
@@ -139,6 +218,7 @@ async def delete_item(item_id: uuid.UUID, db: AsyncSession = Depends(get_db)):
         raise HTTPException(404, "Item not found")
     item.is_available = False
     await db.commit()
+    menu_snapshots.invalidate(item.branch_id)
     return {"ok": True}
 
 
@@ -149,6 +229,8 @@ async def create_variant(data: VariantCreate, db: AsyncSession = Depends(get_db)
     db.add(v)
     await db.commit()
     await db.refresh(v)
+    if branch_id := await _item_branch(v.menu_item_id, db):
+        menu_snapshots.invalidate(branch_id)
     return v
 
 
@@ -159,6 +241,8 @@ async def create_modifier_group(data: ModifierGroupCreate, db: AsyncSession = De
     db.add(g)
     await db.commit()
     await db.refresh(g)
+    if branch_id := await _item_branch(g.menu_item_id, db):
+        menu_snapshots.invalidate(branch_id)
     return g
 
 
@@ -168,4 +252,7 @@ async def create_modifier(data: ModifierCreate, db: AsyncSession = Depends(get_d
     db.add(m)
     await db.commit()
     await db.refresh(m)
+    group = await db.get(MenuModifierGroup, m.modifier_group_id)
+    if group and (branch_id := await _item_branch(group.menu_item_id, db)):
+        menu_snapshots.invalidate(branch_id)
     return m
@@ -0,0 +1,64 @@
+"""Ops router — /api/ops  (runtime metrics for system admins)"""
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from app.bot import tracing
+from app.bot.intent_cache import intent_cache
+from app.bot.llm_gateway import gateway
+from app.bot.faq_store import faq_store
+from app.models.auth import StaffUser, StaffRole
+from app.services import metrics
+from app.services.auth_service import get_current_staff
+from app.services.bot_worker import bot_pool
+from app.services.lanes import customer_lanes
+from app.services.menu_snapshot import menu_snapshots
+from app.services.outbound import dispatcher
+from app.services.session_cache import session_cache
+
+router = APIRouter(prefix="/api/ops", tags=["ops"])
+
+
+def require_system_admin(current_staff: StaffUser = Depends(get_current_staff)) -> StaffUser:
+    if current_staff.role != StaffRole.SYSTEM_ADMIN:
+        raise HTTPException(status.HTTP_403_FORBIDDEN, "Only system admins can view runtime metrics")
+    return current_staff
+
+
+@router.get("/metrics")
+async def get_metrics(current_staff: StaffUser = Depends(require_system_admin)):
+    return {
+        "bot_pool": bot_pool.stats(),
+        "customer_lanes": customer_lanes.stats(),
+        "outbound": dispatcher.stats(),
+        "session_cache": session_cache.stats(),
+        "intent_cache": intent_cache.stats(),
+        "llm": gateway.stats(),
+        "faq": faq_store.stats(),
+        "menu_snapshot": menu_snapshots.stats(),
+        **metrics.snapshot(),
+    }
+
+
+@router.get("/dead-letters")
+async def get_dead_letters(current_staff: StaffUser = Depends(require_system_admin)):
+    """Replies the outbound dispatcher gave up on (most recent last)."""
+    return list(dispatcher.dead_letters)
+
+
+@router.get("/bot-latency")
+async def get_bot_latency(current_staff: StaffUser = Depends(require_system_admin)):
+    """Per-node latency percentiles, overall and split by resolved intent."""
+    return {
+        "nodes": tracing.node_latency(),
+        "graph": metrics.latencies("bot.graph."),
+        "send": metrics.latencies("bot.send."),
+    }
+
+
+@router.get("/traces")
+async def get_traces(
+    limit: int = Query(50, ge=1, le=500),
+    slower_than_ms: float = Query(0, ge=0),
+    current_staff: StaffUser = Depends(require_system_admin),
+):
+    """Most recent per-message bot traces (newest first)."""
+    return tracing.recent_traces(limit, slower_than_ms)
@@ -9,7 +9,11 @@ from datetime import datetime
 from app.database import get_db
 from app.models.tenancy import Restaurant, Branch, Table, TableQRToken
 from app.models.auth import StaffUser, StaffRole
+from app.models.faq import RestaurantFAQ
 from app.services.auth_service import get_current_staff
+from app.services.tenant_cache import tenant_cache
+from app.bot.restaurant_context import restaurant_contexts
+from app.bot.faq_store import faq_store
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
@@ -51,6 +55,19 @@ class BranchCreate(BaseModel):
     gstin: str | None = None
 
 
+class FAQCreate(BaseModel):
+    branch_id: uuid.UUID | None = None
+    question: str  # one phrasing per line
+    answer: str
+
+
+class FAQUpdate(BaseModel):
+    branch_id: uuid.UUID | None = None
+    question: str | None = None
+    answer: str | None = None
+    is_active: bool | None = None
+
+
 class TableCreate(BaseModel):
     branch_id: uuid.UUID
     table_number: int
@@ -82,6 +99,7 @@ async def create_restaurant(data: RestaurantCreate, db: AsyncSession = Depends(g
     db.add(r)
     await db.commit()
     await db.refresh(r)
+    tenant_cache.invalidate(r.id)
     return r
 
 
@@ -113,6 +131,9 @@ async def update_restaurant(restaurant_id: uuid.UUID, data: RestaurantUpdate, db
 
     await db.commit()
     await db.refresh(r)
+    # Webhook routing reads credentials from the tenant cache; restaurant_chat its name
+    tenant_cache.invalidate(r.id)
+    restaurant_contexts.invalidate(r.id)
     return r
 
 
@@ -166,6 +187,77 @@ async def list_branches(restaurant_id: uuid.UUID, db: AsyncSession = Depends(get
     return result.scalars().all()
 
 
+# ─── FAQs (answered by the bot before asking Gemini) ─────────────────────────
+def _check_faq_access(current_staff: StaffUser, restaurant_id: uuid.UUID, *branch_ids: uuid.UUID | None):
+    """`branch_ids`: the branch scope(s) being read or written (None = restaurant-wide)."""
+    if current_staff.role == StaffRole.SYSTEM_ADMIN:
+        return
+    if current_staff.role not in [StaffRole.SUPER_ADMIN, StaffRole.BRANCH_ADMIN] or str(current_staff.restaurant_id) != str(restaurant_id):
+        raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
+    if current_staff.role == StaffRole.BRANCH_ADMIN:
+        # Branch admins only manage their own branch's FAQs, not restaurant-wide or other branches' ones
+        if any(str(branch_id) != str(current_staff.branch_id) for branch_id in branch_ids):
+            raise HTTPException(status.HTTP_403_FORBIDDEN, "Branch admins can only manage FAQs for their assigned branch")
+
+
+@router.get("/restaurants/{restaurant_id}/faqs")
+async def list_faqs(restaurant_id: uuid.UUID, db: AsyncSession = Depends(get_db), current_staff: StaffUser = Depends(get_current_staff)):
+    _check_faq_access(current_staff, restaurant_id)
+    query = select(RestaurantFAQ).where(RestaurantFAQ.restaurant_id == restaurant_id)
+    if current_staff.role == StaffRole.BRANCH_ADMIN:
+        # Force filter by their branch
+        query = query.where(RestaurantFAQ.branch_id == current_staff.branch_id)
+    result = await db.execute(query.order_by(RestaurantFAQ.created_at))
+    return result.scalars().all()
+
+
+@router.post("/restaurants/{restaurant_id}/faqs")
+async def create_faq(restaurant_id: uuid.UUID, data: FAQCreate, db: AsyncSession = Depends(get_db), current_staff: StaffUser = Depends(get_current_staff)):
+    _check_faq_access(current_staff, restaurant_id, data.branch_id)
+    faq = RestaurantFAQ(restaurant_id=restaurant_id, **data.model_dump())
+    db.add(faq)
+    await db.commit()
+    await db.refresh(faq)
+    faq_store.invalidate(restaurant_id)
+    return faq
+
+
+@router.patch("/faqs/{faq_id}")
+async def update_faq(faq_id: uuid.UUID, data: FAQUpdate, db: AsyncSession = Depends(get_db), current_staff: StaffUser = Depends(get_current_staff)):
+    faq = await db.get(RestaurantFAQ, faq_id)
+    if not faq:
+        raise HTTPException(404, "FAQ not found")
+    changes = data.model_dump(exclude_unset=True)
+    # branch_id may be cleared (null = all branches); the other columns are NOT NULL
+    nulled = [key for key in ("question", "answer", "is_active") if key in changes and changes[key] is None]
+    if nulled:
+        raise HTTPException(422, f"{', '.join(nulled)} cannot be null")
+    # Both the current scope and, if it is being moved, the new one
+    _check_faq_access(current_staff, faq.restaurant_id, faq.branch_id, *([changes["branch_id"]] if "branch_id" in changes else []))
+
+    for key, value in changes.items():
+        setattr(faq, key, value)
+    if faq.source == "llm":
+        faq.source = "staff"  # reviewed by a human now
+
+    await db.commit()
+    await db.refresh(faq)
+    faq_store.invalidate(faq.restaurant_id)
+    return faq
+
+
+@router.delete("/faqs/{faq_id}")
+async def delete_faq(faq_id: uuid.UUID, db: AsyncSession = Depends(get_db), current_staff: StaffUser = Depends(get_current_staff)):
+    faq = await db.get(RestaurantFAQ, faq_id)
+    if not faq:
+        raise HTTPException(404, "FAQ not found")
+    _check_faq_access(current_staff, faq.restaurant_id, faq.branch_id)
+    await db.delete(faq)
+    await db.commit()
+    faq_store.invalidate(faq.restaurant_id)
+    return {"ok": True}
+
+
 # ─── Tables ──────────────────────────────────────────────────────────────────
 @router.post("/tables")
 async def create_table(data: TableCreate, db: AsyncSession = Depends(get_db), current_staff: StaffUser = Depends(get_current_staff)):
@@ -2,18 +2,28 @@
 from fastapi import APIRouter, Request, Response, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.config import settings
+from app.bot import speculative, tracing, uow
 from app.bot.graph import compiled_graph
+from app.bot.fast_path import fast_path
+from app.bot.payload import parse_webhook, InboundMessage, PayloadError
+from app.bot.state import BotState
 from app.database import AsyncSessionLocal
 from app.models.logs import WhatsAppMessageLog, MessageDirection
-from app.bot.wa_sender import send_text, send_interactive_buttons, send_interactive_list
-from app.models.tenancy import Restaurant
-from sqlalchemy import select
+from app.services import metrics
+from app.services.bot_worker import bot_pool, QueueFullError
+from app.services.lanes import customer_lanes, customer_key
+from app.services.dedup import deduper
+from app.services.tenant_cache import tenant_cache, Tenant
+from app.services.status_buffer import status_buffer
+from app.services.outbound import dispatcher, OutboundMessage
 from sqlalchemy.exc import IntegrityError
+import asyncio
 import hmac
 import hashlib
 import uuid
 import logging
-import json
+import random
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -37,11 +47,9 @@ def verify_signature(payload: bytes, signature: str, app_secret: str) -> bool:
 @router.get("/{restaurant_id}")
 async def verify_webhook(restaurant_id: uuid.UUID, request: Request):
     """Meta webhook verification handshake per restaurant."""
-    async with AsyncSessionLocal() as db:
-        result = await db.execute(select(Restaurant).where(Restaurant.id == restaurant_id))
-        restaurant = result.scalar_one_or_none()
-        if not restaurant:
-            raise HTTPException(404, "Restaurant not found")
+    restaurant = await tenant_cache.get(restaurant_id)
+    if not restaurant:
+        raise HTTPException(404, "Restaurant not found")
 
     params = request.query_params
     mode = params.get("hub.mode")
@@ -49,7 +57,7 @@ async def verify_webhook(restaurant_id: uuid.UUID, request: Request):
     challenge = params.get("hub.challenge")
     
     # Use restaurant-specific verify token, fallback to global settings
-    verify_token = restaurant.whatsapp_verify_token or settings.WA_WEBHOOK_VERIFY_TOKEN
+    verify_token = restaurant.verify_token or settings.WA_WEBHOOK_VERIFY_TOKEN
     if mode == "subscribe" and token == verify_token:
         return Response(content=challenge, media_type="text/plain")
     
@@ -60,85 +68,161 @@ async def verify_webhook(restaurant_id: uuid.UUID, request: Request):
 async def receive_webhook(restaurant_id: uuid.UUID, request: Request):
     """Inbound WhatsApp messages per restaurant → LangGraph bot."""
     body_raw = await request.body()
-    try:
-        payload = await request.json()
-        print(f"WEBHOOK RECEIVED: {json.dumps(payload, indent=2)}")
-    except Exception as e:
-        print(f"WEBHOOK JSON ERROR: {str(e)}")
-        return {"status": "error", "reason": "invalid_json"}
-        
+    _sample_payload(body_raw)
     signature = request.headers.get("X-Hub-Signature-256")
 
-    async with AsyncSessionLocal() as db:
-        result = await db.execute(select(Restaurant).where(Restaurant.id == restaurant_id))
-        restaurant = result.scalar_one_or_none()
-        if not restaurant:
-            raise HTTPException(404, "Restaurant not found")
-        
-        access_token = restaurant.whatsapp_access_token
-        app_secret = restaurant.whatsapp_app_secret
+    restaurant = await tenant_cache.get(restaurant_id)
+    if not restaurant:
+        raise HTTPException(404, "Restaurant not found")
 
-        if not access_token:
-            logger.error(f"Missing WhatsApp Access Token for restaurant {restaurant_id}")
-            return {"status": "ignored", "reason": "missing_credentials"}
+    if not restaurant.access_token:
+        logger.error(f"Missing WhatsApp Access Token for restaurant {restaurant_id}")
+        return {"status": "ignored", "reason": "missing_credentials"}
 
-        # Verify signature if secret is provided
-        if app_secret:
-            if not verify_signature(body_raw, signature, app_secret):
-                raise HTTPException(401, "Invalid signature")
+    # Verify signature if secret is provided
+    if restaurant.app_secret:
+        if not verify_signature(body_raw, signature, restaurant.app_secret):
+            raise HTTPException(401, "Invalid signature")
 
-        # Run LangGraph bot
-        try:
-            val = payload.get("entry", [{}])[0].get("changes", [{}])[0].get("value", {})
-            if not val.get("messages"):
-                logger.info("Skip webhook: no messages (likely a status update)")
-                return {"status": "ignored", "reason": "no_messages"}
-
-            initial_state = {
-                "raw_message": payload,
-                "restaurant_id": str(restaurant_id)
-            }
-            initial_state["access_token"] = access_token
-            initial_state["phone_number_id"] = restaurant.whatsapp_phone_number_id
-            
-            logger.info(f"Invoking graph for restaurant {restaurant.name} ({restaurant_id})")
-            result = await compiled_graph.ainvoke(initial_state)
-            logger.info(f"Graph execution finished. Intent: {result.get('intent')}, Error: {result.get('error')}")
-
-            # Send the response back to WhatsApp
-            final = result.get("final_response")
-            to = result.get("wa_user_id") # MUST be the phone number (WA_ID)
-            p_id = restaurant.whatsapp_phone_number_id
-            token = restaurant.whatsapp_access_token
-            
-            print(f"WEBHOOK FLOW END: intent={result.get('intent')}, to={to}, has_response={bool(final)}")
+    # Decode the body once; dedup, lanes and ingest_webhook all share the parsed records
+    try:
+        batch = parse_webhook(body_raw)
+    except PayloadError as e:
+        logger.warning(f"Webhook JSON error: {e}")
+        return {"status": "error", "reason": "invalid_json"}
 
-            if final and to and p_id and token:
-                msg_type = final.get("type", "text")
-                print(f"SENDING REPLY: type={msg_type}, to={to}, p_id={p_id}")
-                try:
-                    if msg_type == "text":
-                        resp = await send_text(to, final["body"], p_id, token)
-                    elif msg_type == "buttons":
-                        resp = await send_interactive_buttons(to, final["body"], final["buttons"], p_id, token)
-                    elif msg_type == "list":
-                        resp = await send_interactive_list(to, final["body"], final.get("button_label", "View"), final["sections"], p_id, token)
-                    
-                    print(f"META RESPONSE: {resp}")
-                    logger.info(f"WhatsApp API response: {resp}")
-                except Exception as e:
-                    print(f"SEND ERROR: {str(e)}")
-                    logger.exception(f"Failed to send WhatsApp message: {str(e)}")
-            elif final and to:
-                print(f"MISSING CREDENTIALS: p_id={p_id}, token={'set' if token else 'missing'}")
-                logger.error(f"Cannot send reply: Missing credentials (p_id={p_id}, token={'set' if token else 'missing'})")
+    # Delivery status callbacks are buffered and written in batches, never run through the graph
+    for st in batch.statuses:
+        status_buffer.add(st.wa_message_id, st.status)
+
+    if not batch.messages:
+        if batch.statuses:
+            return {"status": "ok", "statuses": len(batch.statuses)}
+        logger.info("Skip webhook: no messages")
+        return {"status": "ignored", "reason": "no_messages"}
+
+    # Meta batches several entries / changes / messages into one POST — each message is its own job
+    jobs = []
+    for inbound in batch.messages:
+        # Fast check: a redelivery we already handled costs no DB round trip
+        if deduper.seen(inbound.wa_message_id):
+            metrics.incr("dedup.memory_hits")
+            continue
+        # Messages from the same customer must not race on their cart / session rows
+        jobs.append((customer_key(str(restaurant.id), inbound.wa_user_id), _message_job(restaurant, inbound)))
+
+    if not jobs:
+        return {"status": "ignored", "reason": "duplicate"}
+    metrics.incr("webhook.messages", len(jobs))
+
+    # Ack-first mode: hand the messages to the worker pool and return to Meta immediately
+    if settings.BOT_ASYNC_WEBHOOK and bot_pool.running:
+        try:
+            for lane_key, job in jobs:
+                bot_pool.submit(job, key=lane_key)
+        except QueueFullError:
+            # Meta retries non-2xx deliveries (dedup drops the ones already queued), so shed load
+            logger.warning(f"Bot queue full, rejecting webhook for restaurant {restaurant_id}")
+            raise HTTPException(503, "Bot queue is full")
+        return {"status": "queued", "messages": len(jobs)}
+
+    # Lanes keep per-customer order; different customers in the batch run concurrently
+    received_at = time.perf_counter()
+    results = await asyncio.gather(*(_in_lane(lane_key, job, received_at) for lane_key, job in jobs), return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            metrics.incr("webhook.job_failed")
+            logger.error("Message job failed", exc_info=result)
+    return {"status": "ok", "messages": len(jobs)}
+
+
+def _sample_payload(body: bytes):
+    """Debug hook: log a size-capped copy of a sampled fraction of webhook bodies."""
+    rate = settings.WEBHOOK_LOG_SAMPLE_RATE
+    if rate <= 0 or not logger.isEnabledFor(logging.DEBUG) or random.random() >= rate:
+        return
+    cap = settings.WEBHOOK_LOG_MAX_BYTES
+    logger.debug(f"Webhook payload sample ({len(body)} bytes): {body[:cap].decode('utf-8', 'replace')}")
+
+
+def _message_job(restaurant: Tenant, inbound: InboundMessage):
+    """Build the unit of work for one inbound message. The caller serialises it per customer:
+    the worker pool by lane key, the inline path with customer_lanes."""
+
+    async def run(enqueued_at: float):
+        # One session for the whole turn: the dedup claim, then every graph node
+        async with AsyncSessionLocal() as db:
+            is_new = await deduper.claim(db, restaurant.id, inbound.wa_message_id, inbound.raw.get("type", "text"), inbound.raw)
+            if not is_new:
+                logger.info(f"Skip duplicate message {inbound.wa_message_id}")
+                return
+            await _run_bot(inbound, restaurant, enqueued_at, db)
+
+    return run
+
+
+async def _in_lane(lane_key, job, received_at: float):
+    async with customer_lanes.hold(lane_key):
+        await job(received_at)
+
+
+async def _run_bot(inbound: InboundMessage, restaurant: Tenant, enqueued_at: float, db: AsyncSession):
+    """Run the LangGraph bot for one inbound message and queue the reply for WhatsApp."""
+    try:
+        # Credentials stay on `restaurant` (used below to send the reply), not in the graph state
+        initial_state: BotState = {
+            "inbound": inbound,
+            "restaurant_id": str(restaurant.id)
+        }
+        
+        logger.info(f"Invoking graph for restaurant {restaurant.name} ({restaurant.id})")
+        trace = tracing.start(str(restaurant.id), inbound.wa_message_id)
+        try:
+            # Button / list replies skip LangGraph; free text gets the full graph
+            route = fast_path.route(inbound)
+            if route is not None:
+                trace.path = "fast"
+                result = await fast_path.run(initial_state, route, uow.graph_config(db))
             else:
-                print(f"NO RESPONSE PREPARED for {to}")
-                logger.warning(f"No response prepared for message from {to}")
-                
+                # Free text: classify while resolve_session hits the DB; intent_router joins it
+                speculation = speculative.start(inbound, str(restaurant.id)) if settings.BOT_SPECULATIVE_INTENT else None
+                try:
+                    result = await compiled_graph.ainvoke(initial_state, uow.graph_config(db, speculation=speculation))
+                finally:
+                    speculative.discard(speculation)
         except Exception as e:
-            logger.exception(f"Error in LangGraph execution: {str(e)}")
-            # Optional: send a generic error message to the user?
-            # await send_text(to, "Sorry, I'm having trouble processing your request. Please try again later.", p_id, token)
-
-    return {"status": "ok"}
+            trace.error = str(e)
+            tracing.finish(trace)
+            tracing.emit(trace)
+            raise
+        tracing.finish(trace, result)
+        logger.info(f"Graph execution finished. Intent: {result.get('intent')}, Error: {result.get('error')}")
+
+        # Queue the response for WhatsApp — the dispatcher handles rate limits and retries
+        final = result.get("final_response")
+        to = result.get("wa_user_id") # MUST be the phone number (WA_ID)
+        p_id = restaurant.phone_number_id
+        token = restaurant.access_token
+
+        if final and to and p_id and token:
+            dispatcher.enqueue(OutboundMessage(
+                restaurant_id=restaurant.id,
+                phone_number_id=p_id,
+                access_token=token,
+                to=to,
+                response=final,
+                enqueued_at=enqueued_at,
+                session_id=result.get("session_id"),
+                trace=trace,
+            ))
+            return
+        if final and to:
+            logger.error(f"Cannot send reply: Missing credentials (p_id={p_id}, token={'set' if token else 'missing'})")
+        else:
+            logger.warning(f"No response prepared for message from {to}")
+        tracing.emit(trace)
+            
+    except Exception as e:
+        logger.exception(f"Error in LangGraph execution: {str(e)}")
+        # Optional: send a generic error message to the user?
+        # await send_text(to, "Sorry, I'm having trouble processing your request. Please try again later.", p_id, token)
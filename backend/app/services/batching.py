@@ -0,0 +1,90 @@
+"""Write-behind batching — buffer rows in memory, flush them every N ms or every M rows."""
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import Any
+
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class BatchFlusher(ABC):
+    """Base class for background batch writers.
+
+    Subclasses keep their own buffer and implement `pending`, `_drain` and `_write`.
+    Call `_notify()` after buffering a row so a full batch is flushed early.
+    """
+
+    name = "batch"
+
+    def __init__(self, max_rows: int, interval_ms: int):
+        self.max_rows = max_rows
+        self.interval = interval_ms / 1000
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    @abstractmethod
+    def pending(self) -> int:
+        """Rows currently buffered."""
+
+    @abstractmethod
+    def _drain(self) -> Any:
+        """Detach and return the current buffer."""
+
+    @abstractmethod
+    async def _write(self, batch: Any) -> int:
+        """Persist a drained batch; returns the number of rows written."""
+
+    def _restore(self, batch: Any):
+        """Called with a batch whose write failed. Default: drop it."""
+
+    def _notify(self):
+        if self.pending() >= self.max_rows:
+            self._wake.set()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=f"{self.name}-flusher")
+
+    async def stop(self):
+        """Stop the background loop and flush whatever is still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception(f"{self.name} final flush failed")
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception(f"{self.name} flush failed")
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            if not self.pending():
+                return 0
+            batch = self._drain()
+            started = time.perf_counter()
+            try:
+                written = await self._write(batch)
+            except Exception:
+                metrics.incr(f"{self.name}.failed_flushes")
+                self._restore(batch)
+                raise
+            metrics.latency(f"{self.name}.flush").since(started)
+            metrics.incr(f"{self.name}.flushes")
+            metrics.incr(f"{self.name}.rows_written", written)
+            return written
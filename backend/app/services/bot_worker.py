@@ -0,0 +1,137 @@
+"""Background bot worker pool — lets the webhook ack Meta before running the graph."""
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Hashable
+
+from app.config import settings
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    pass
+
+
+@dataclass(slots=True)
+class BotJob:
+    run: Callable[[float], Awaitable[None]]  # receives the enqueue timestamp
+    enqueued_at: float
+    key: Hashable | None = None              # jobs sharing a key run one at a time, in order
+
+
+class BotWorkerPool:
+    """Bounded in-process queue served by a fixed number of asyncio workers.
+
+    Lane-aware: only one job per key is ever in the queue or running. Later jobs
+    for a busy key are parked in the key's deque and queued when the current one
+    finishes, so a worker never waits on another job of the same customer while
+    other customers' jobs are queued behind it.
+    """
+
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self.queue_size = queue_size
+        # Not bound to an event loop until first used (3.10+), so it can be built at import.
+        # Unbounded: submit enforces queue_size, so a parked job can always be queued
+        self.queue: asyncio.Queue[BotJob] = asyncio.Queue()
+        self._lanes: dict[Hashable, deque[BotJob]] = {}  # busy key -> its parked jobs
+        self._parked = 0
+        self.busy = 0
+        self._tasks: list[asyncio.Task] = []
+        self._busy_seconds = 0.0
+        self._started_at = 0.0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self):
+        if self.running:
+            return
+        self._started_at = time.perf_counter()
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"bot-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(f"Bot worker pool started ({self.workers} workers, queue size {self.queue_size})")
+
+    async def stop(self, grace_seconds: float = 10.0):
+        """Drain queued jobs for up to `grace_seconds`, then cancel the workers."""
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout=grace_seconds)
+        except asyncio.TimeoutError:
+            logger.warning(f"Bot worker pool stopped with {self.queue.qsize()} jobs still queued")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, run: Callable[[float], Awaitable[None]], key: Hashable | None = None):
+        """Queue a job without waiting. Raises QueueFullError when the queue is at capacity."""
+        if not self.running:
+            raise RuntimeError("Bot worker pool is not running")
+        if self.queue.qsize() + self._parked >= self.queue_size:
+            metrics.incr("bot_pool.rejected")
+            raise QueueFullError("Bot queue is full")
+        job = BotJob(run=run, enqueued_at=time.perf_counter(), key=key)
+        metrics.incr("bot_pool.enqueued")
+        if key is not None:
+            parked = self._lanes.get(key)
+            if parked is not None:
+                # The key already has a job queued or running — this one waits its turn off the queue
+                parked.append(job)
+                self._parked += 1
+                metrics.incr("bot_pool.parked")
+                return
+            self._lanes[key] = deque()
+        self.queue.put_nowait(job)
+
+    def _next_in_lane(self, key: Hashable):
+        """The key's job finished: queue its next parked job, or retire the lane."""
+        parked = self._lanes.get(key)
+        if parked:
+            self._parked -= 1
+            self.queue.put_nowait(parked.popleft())
+        else:
+            self._lanes.pop(key, None)
+
+    async def _worker(self):
+        while True:
+            job = await self.queue.get()
+            metrics.latency("bot_pool.queue_wait").since(job.enqueued_at)
+            self.busy += 1
+            started = time.perf_counter()
+            try:
+                await job.run(job.enqueued_at)
+            except Exception:
+                metrics.incr("bot_pool.failed")
+                logger.exception("Bot job failed")
+            finally:
+                self.busy -= 1
+                self._busy_seconds += time.perf_counter() - started
+                if job.key is not None:
+                    self._next_in_lane(job.key)
+                self.queue.task_done()
+
+    def stats(self) -> dict:
+        uptime = time.perf_counter() - self._started_at if self.running else 0.0
+        return {
+            "running": self.running,
+            "workers": self.workers,
+            "busy_workers": self.busy,
+            "utilisation": round(self.busy / self.workers, 3) if self.workers else 0.0,
+            "avg_utilisation": round(self._busy_seconds / (uptime * self.workers), 3) if uptime and self.workers else 0.0,
+            "queue_depth": self.queue.qsize(),
+            "parked": self._parked,
+            "active_lanes": len(self._lanes),
+            "queue_capacity": self.queue_size,
+        }
+
+
+bot_pool = BotWorkerPool(workers=settings.BOT_WORKERS, queue_size=settings.BOT_QUEUE_SIZE)
@@ -43,8 +43,7 @@ async def recalculate_cart(cart: Cart, db: AsyncSession):
 
     for ci in items:
         # Get GST percent from menu_item
-        item_result = await db.execute(select(MenuItem).where(MenuItem.id == ci.menu_item_id))
-        menu_item = item_result.scalar_one_or_none()
+        menu_item = await db.get(MenuItem, ci.menu_item_id)
         if not menu_item:
             print(f"WARNING: MenuItem {ci.menu_item_id} not found for cart item {ci.id}")
             continue
@@ -80,15 +79,13 @@ async def add_item_to_cart(
 ) -> Cart:
     cart = await get_or_create_cart(session_id, db)
 
-    item_result = await db.execute(select(MenuItem).where(MenuItem.id == menu_item_id))
-    menu_item = item_result.scalar_one_or_none()
+    menu_item = await db.get(MenuItem, menu_item_id)
     if not menu_item or not menu_item.is_available:
         raise ValueError("Item not available")
 
     unit_price = menu_item.base_price
     if variant_id:
-        v_result = await db.execute(select(MenuItemVariant).where(MenuItemVariant.id == variant_id))
-        variant = v_result.scalar_one_or_none()
+        variant = await db.get(MenuItemVariant, variant_id)
         if variant:
             unit_price = variant.price
 
@@ -106,8 +103,7 @@ async def add_item_to_cart(
 
     if modifier_ids:
         for mod_id in modifier_ids:
-            mod_result = await db.execute(select(MenuModifier).where(MenuModifier.id == mod_id))
-            mod = mod_result.scalar_one_or_none()
+            mod = await db.get(MenuModifier, mod_id)
             if mod:
                 cim = CartItemModifier(
                     cart_item_id=cart_item.id,
@@ -124,12 +120,10 @@ async def add_item_to_cart(
 
 
 async def remove_cart_item(cart_item_id: uuid.UUID, db: AsyncSession) -> Cart:
-    result = await db.execute(select(CartItem).where(CartItem.id == cart_item_id))
-    ci = result.scalar_one_or_none()
+    ci = await db.get(CartItem, cart_item_id)
     if not ci:
         raise ValueError("Cart item not found")
-    cart_result = await db.execute(select(Cart).where(Cart.id == ci.cart_id))
-    cart = cart_result.scalar_one_or_none()
+    cart = await db.get(Cart, ci.cart_id)
     if not cart:
         raise ValueError("Cart not found for item")
     await db.delete(ci)
@@ -0,0 +1,82 @@
+"""Inbound message dedup — in-memory LRU front filter + durable whatsapp_message_logs insert."""
+import logging
+import uuid
+from collections import OrderedDict
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.logs import WhatsAppMessageLog, MessageDirection
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class MessageDeduper:
+    """Remembers recent wa_message_ids so Meta redeliveries are dropped without a DB round trip."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._seen: OrderedDict[str, None] = OrderedDict()
+
+    def seen(self, wa_message_id: str) -> bool:
+        if wa_message_id in self._seen:
+            self._seen.move_to_end(wa_message_id)
+            return True
+        return False
+
+    def remember(self, wa_message_id: str):
+        self._seen[wa_message_id] = None
+        self._seen.move_to_end(wa_message_id)
+        if len(self._seen) > self.capacity:
+            self._seen.popitem(last=False)
+
+    def forget(self, wa_message_id: str):
+        self._seen.pop(wa_message_id, None)
+
+    async def claim(
+        self,
+        db: AsyncSession,
+        restaurant_id: uuid.UUID,
+        wa_message_id: str,
+        message_type: str,
+        raw_payload: dict,
+    ) -> bool:
+        """Record an inbound message. Returns False if it was already processed."""
+        if not wa_message_id:
+            return True
+        if self.seen(wa_message_id):
+            metrics.incr("dedup.memory_hits")
+            return False
+
+        # Claim in memory before awaiting the DB so concurrent redeliveries stop here
+        self.remember(wa_message_id)
+        try:
+            result = await db.execute(
+                pg_insert(WhatsAppMessageLog)
+                .values(
+                    restaurant_id=restaurant_id,
+                    wa_message_id=wa_message_id,
+                    direction=MessageDirection.INBOUND,
+                    message_type=message_type,
+                    raw_payload=raw_payload,
+                )
+                .on_conflict_do_nothing(index_elements=["wa_message_id"])
+                .returning(WhatsAppMessageLog.id)
+            )
+            inserted = result.scalar_one_or_none() is not None
+            await db.commit()
+        except Exception:
+            # Fail open: a logging outage must not stop the bot from answering
+            logger.exception(f"Dedup insert failed for message {wa_message_id}")
+            self.forget(wa_message_id)
+            await db.rollback()
+            return True
+
+        if not inserted:
+            metrics.incr("dedup.db_hits")
+        return inserted
+
+
+deduper = MessageDeduper(capacity=settings.DEDUP_CACHE_SIZE)
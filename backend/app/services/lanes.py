@@ -0,0 +1,47 @@
+"""Keyed processing lanes — one customer's messages run in order, different customers run in parallel."""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Hashable
+
+
+class _Lane:
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()  # FIFO: waiters are woken in arrival order
+        self.users = 0
+
+
+class KeyedLanes:
+    """A FIFO lock per key. A lane exists only while someone holds or waits on it."""
+
+    def __init__(self):
+        self._lanes: dict[Hashable, _Lane] = {}
+
+    @asynccontextmanager
+    async def hold(self, key: Hashable):
+        lane = self._lanes.get(key)
+        if lane is None:
+            lane = self._lanes[key] = _Lane()
+        lane.users += 1
+        try:
+            async with lane.lock:
+                yield
+        finally:
+            lane.users -= 1
+            if lane.users == 0:
+                # Idle lane — drop it so memory tracks active customers only
+                del self._lanes[key]
+
+    def stats(self) -> dict:
+        return {
+            "active_lanes": len(self._lanes),
+            "waiting": sum(lane.users - 1 for lane in self._lanes.values()),
+        }
+
+
+def customer_key(restaurant_id: str, wa_user_id: str) -> tuple[str, str]:
+    return (restaurant_id, wa_user_id)
+
+
+customer_lanes = KeyedLanes()
@@ -0,0 +1,94 @@
+"""Menu read responses — serialized JSON bodies + ETags per branch menu version, for conditional GETs."""
+import hashlib
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import orjson
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from app.config import settings
+from app.services import metrics
+from app.services.menu_snapshot import menu_snapshots
+
+
+@dataclass(frozen=True, slots=True)
+class CachedBody:
+    branch_id: str
+    version: int
+    etag: str
+    body: bytes
+    stored_at: float
+
+
+class MenuResponseCache:
+    """LRU of serialized menu responses, valid while the branch's menu version is unchanged.
+
+    Versions are bumped by the menu write routes (menu_snapshots.invalidate). They
+    are per worker, so the ETag is a hash of the body: every worker agrees on it,
+    and another worker's edit shows up within the TTL.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, max_age_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.cache_control = f"private, max-age={max_age_seconds}" if max_age_seconds > 0 else "no-cache"
+        self._entries: OrderedDict[tuple, CachedBody] = OrderedDict()
+
+    def get(self, key: tuple) -> CachedBody | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.version != menu_snapshots.version(entry.branch_id) or time.monotonic() - entry.stored_at >= self.ttl_seconds:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: tuple, branch_id: str | uuid.UUID, version: int, payload) -> CachedBody:
+        """Serialize `payload` once; `version` must be read before the DB query that produced it."""
+        body = orjson.dumps(jsonable_encoder(payload))
+        entry = CachedBody(
+            branch_id=str(branch_id),
+            version=version,
+            etag='"' + hashlib.sha1(body).hexdigest()[:20] + '"',
+            body=body,
+            stored_at=time.monotonic(),
+        )
+        # A write during the query already bumped the version: serve it, don't keep it
+        if menu_snapshots.version(branch_id) == version:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def respond(self, request: Request, entry: CachedBody) -> Response:
+        """304 if the client already has this body (If-None-Match), else the cached bytes."""
+        headers = {"ETag": entry.etag, "Cache-Control": self.cache_control}
+        if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+            metrics.incr("menu_http.not_modified")
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+    def clear(self):
+        self._entries.clear()
+
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+menu_responses = MenuResponseCache(
+    max_entries=settings.MENU_HTTP_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.MENU_SNAPSHOT_TTL_SECONDS,
+    max_age_seconds=settings.MENU_HTTP_MAX_AGE_SECONDS,
+)
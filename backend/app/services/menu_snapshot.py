@@ -0,0 +1,204 @@
+"""Menu snapshots — an immutable, versioned in-process copy of one branch's menu for the bot's read paths."""
+import asyncio
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.menu import MenuCategory, MenuItem, MenuModifierGroup
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class ModifierView:
+    id: uuid.UUID
+    name: str
+    price_delta: float
+    is_available: bool
+
+
+@dataclass(frozen=True, slots=True)
+class ModifierGroupView:
+    id: uuid.UUID
+    name: str
+    min_select: int
+    max_select: int
+    is_required: bool
+    modifiers: tuple[ModifierView, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class VariantView:
+    id: uuid.UUID
+    name: str
+    price: float
+    is_available: bool
+
+
+@dataclass(frozen=True, slots=True)
+class ItemView:
+    """Same attribute names as MenuItem, so bot code reads either."""
+    id: uuid.UUID
+    branch_id: uuid.UUID
+    category_id: uuid.UUID
+    name: str
+    description: str | None
+    base_price: float
+    gst_percent: int
+    is_veg: bool
+    is_jain: bool
+    spice_level: str | None
+    is_available: bool
+    variants: tuple[VariantView, ...]
+    modifier_groups: tuple[ModifierGroupView, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class CategoryView:
+    id: uuid.UUID
+    name: str
+    sort_order: int
+    estimated_prep_minutes: int | None
+    is_active: bool
+
+
+class MenuSnapshot:
+    """One branch's menu at one version. Never mutated — a menu write swaps in a new snapshot."""
+
+    __slots__ = ("branch_id", "version", "built_at", "categories", "available_items", "_items", "_by_category")
+
+    def __init__(self, branch_id: str, version: int, categories: list[CategoryView], items: list[ItemView]):
+        self.branch_id = branch_id
+        self.version = version
+        self.built_at = time.monotonic()
+        # Active categories in menu order
+        self.categories = tuple(sorted((c for c in categories if c.is_active), key=lambda c: (c.sort_order, c.name)))
+        order = {c.id: (c.sort_order, c.name) for c in categories}
+        items = sorted(items, key=lambda i: (order.get(i.category_id, (0, "")), i.name))
+        self.available_items = tuple(i for i in items if i.is_available)
+        # Unavailable items stay addressable by id: carts, orders and bills still name them
+        self._items = {str(i.id): i for i in items}
+        by_category: dict[str, list[ItemView]] = {}
+        for i in self.available_items:
+            by_category.setdefault(str(i.category_id), []).append(i)
+        self._by_category = {k: tuple(v) for k, v in by_category.items()}
+
+    def item(self, item_id: str | uuid.UUID) -> ItemView | None:
+        return self._items.get(str(item_id))
+
+    def category_items(self, category_id: str | uuid.UUID) -> tuple[ItemView, ...]:
+        return self._by_category.get(str(category_id), ())
+
+    def items_by_veg(self, is_veg: bool) -> list[ItemView]:
+        return [i for i in self.available_items if i.is_veg == is_veg]
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+def _item_view(item: MenuItem) -> ItemView:
+    return ItemView(
+        id=item.id,
+        branch_id=item.branch_id,
+        category_id=item.category_id,
+        name=item.name,
+        description=item.description,
+        base_price=item.base_price,
+        gst_percent=item.gst_percent,
+        is_veg=bool(item.is_veg),
+        is_jain=bool(item.is_jain),
+        spice_level=getattr(item.spice_level, "value", item.spice_level),
+        is_available=bool(item.is_available),
+        variants=tuple(
+            VariantView(v.id, v.name, v.price, bool(v.is_available)) for v in item.variants
+        ),
+        modifier_groups=tuple(
+            ModifierGroupView(
+                g.id, g.name, g.min_select, g.max_select, bool(g.is_required),
+                tuple(ModifierView(m.id, m.name, m.price_delta, bool(m.is_available)) for m in g.modifiers),
+            )
+            for g in item.modifier_groups
+        ),
+    )
+
+
+class MenuSnapshotCache:
+    """Built lazily (one build per branch at a time), replaced when the menu routers write.
+
+    The TTL only bounds how long another worker's edit can go unseen; within a
+    worker every write invalidates immediately and bumps the branch's version.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._snapshots: dict[str, MenuSnapshot] = {}
+        self._versions: dict[str, int] = {}
+        self._builds: dict[str, asyncio.Task] = {}
+
+    def version(self, branch_id: str | uuid.UUID) -> int:
+        return self._versions.get(str(branch_id), 0)
+
+    async def get(self, branch_id: str | uuid.UUID) -> MenuSnapshot:
+        branch_id = str(branch_id)
+        snap = self._snapshots.get(branch_id)
+        if snap is not None and time.monotonic() - snap.built_at < self.ttl_seconds:
+            metrics.incr("menu_snapshot.hits")
+            return snap
+        metrics.incr("menu_snapshot.misses")
+
+        build = self._builds.get(branch_id)
+        if build is None:
+            build = self._builds[branch_id] = asyncio.create_task(self._build(branch_id))
+            build.add_done_callback(lambda t: self._builds.pop(branch_id, None) if self._builds.get(branch_id) is t else None)
+        return await asyncio.shield(build)
+
+    async def _build(self, branch_id: str) -> MenuSnapshot:
+        version = self.version(branch_id)
+        started = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            cats = await db.execute(select(MenuCategory).where(MenuCategory.branch_id == uuid.UUID(branch_id)))
+            items = await db.execute(
+                select(MenuItem).where(MenuItem.branch_id == uuid.UUID(branch_id)).options(
+                    selectinload(MenuItem.variants),
+                    selectinload(MenuItem.modifier_groups).selectinload(MenuModifierGroup.modifiers),
+                )
+            )
+            categories = [
+                CategoryView(c.id, c.name, c.sort_order or 0, c.estimated_prep_minutes, bool(c.is_active))
+                for c in cats.scalars().all()
+            ]
+            item_views = [_item_view(i) for i in items.scalars().all()]
+        snap = MenuSnapshot(branch_id, version, categories, item_views)
+        metrics.latency("menu_snapshot.build").since(started)
+        # A write that landed while we were reading makes this snapshot stale already
+        if self.version(branch_id) == version:
+            self._snapshots[branch_id] = snap
+        return snap
+
+    def invalidate(self, branch_id: str | uuid.UUID):
+        """Called after a menu write commits: new version, next read rebuilds."""
+        branch_id = str(branch_id)
+        self._versions[branch_id] = self.version(branch_id) + 1
+        self._snapshots.pop(branch_id, None)
+        self._builds.pop(branch_id, None)
+        metrics.incr("menu_snapshot.invalidations")
+
+    def clear(self):
+        self._snapshots.clear()
+        self._builds.clear()
+
+    def stats(self) -> dict:
+        return {
+            "branches": len(self._snapshots),
+            "items": sum(len(s) for s in self._snapshots.values()),
+        }
+
+
+menu_snapshots = MenuSnapshotCache(ttl_seconds=settings.MENU_SNAPSHOT_TTL_SECONDS)
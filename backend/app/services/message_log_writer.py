@@ -0,0 +1,81 @@
+"""Outbound message log — sent replies written to whatsapp_message_logs in multi-row INSERTs."""
+import logging
+import uuid
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.logs import WhatsAppMessageLog, MessageDirection
+from app.services import metrics
+from app.services.batching import BatchFlusher
+
+logger = logging.getLogger(__name__)
+
+
+class MessageLogWriter(BatchFlusher):
+    """Buffers OUTBOUND log rows; the reply path only appends to a list."""
+
+    name = "message_log_writer"
+
+    def __init__(self, max_rows: int, interval_ms: int, max_buffered: int):
+        super().__init__(max_rows, interval_ms)
+        self.max_buffered = max_buffered
+        self._rows: list[dict] = []
+
+    def add_outbound(
+        self,
+        restaurant_id: uuid.UUID,
+        wa_message_id: str,
+        message_type: str,
+        payload: dict,
+        session_id: str | None = None,
+    ):
+        if not wa_message_id:
+            return
+        if len(self._rows) >= self.max_buffered:
+            metrics.incr("message_log_writer.dropped")
+            return
+        self._rows.append({
+            "id": uuid.uuid4(),
+            "restaurant_id": restaurant_id,
+            "wa_message_id": wa_message_id,
+            "session_id": uuid.UUID(session_id) if session_id else None,
+            "direction": MessageDirection.OUTBOUND,
+            "message_type": message_type,
+            "raw_payload": payload,
+        })
+        self._notify()
+
+    def pending(self) -> int:
+        return len(self._rows)
+
+    def _drain(self) -> list[dict]:
+        rows, self._rows = self._rows, []
+        return rows
+
+    def _restore(self, batch: list[dict]):
+        # Put the failed batch back in front, within the buffer cap
+        room = max(0, self.max_buffered - len(self._rows))
+        if len(batch) > room:
+            metrics.incr("message_log_writer.dropped", len(batch) - room)
+        self._rows = batch[:room] + self._rows
+
+    async def _write(self, batch: list[dict]) -> int:
+        async with AsyncSessionLocal() as db:
+            # Chunked to stay well under asyncpg's bind-parameter limit after a backlog
+            for i in range(0, len(batch), self.max_rows):
+                await db.execute(
+                    pg_insert(WhatsAppMessageLog)
+                    .values(batch[i:i + self.max_rows])
+                    .on_conflict_do_nothing(index_elements=["wa_message_id"])
+                )
+            await db.commit()
+        return len(batch)
+
+
+message_log_writer = MessageLogWriter(
+    max_rows=settings.OUTBOUND_LOG_FLUSH_MAX_ROWS,
+    interval_ms=settings.OUTBOUND_LOG_FLUSH_INTERVAL_MS,
+    max_buffered=settings.OUTBOUND_LOG_MAX_BUFFERED,
+)
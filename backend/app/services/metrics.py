@@ -0,0 +1,68 @@
+"""In-process metrics — counters and rolling latency windows for ops endpoints."""
+import time
+from collections import deque
+from typing import Dict
+
+
+class LatencyWindow:
+    """Keeps the most recent N latency samples (seconds) and reports percentiles."""
+
+    def __init__(self, size: int = 2048):
+        self.samples: deque[float] = deque(maxlen=size)
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self.samples.append(seconds)
+        self.count += 1
+
+    def since(self, started: float):
+        """Observe the time elapsed since a `time.perf_counter()` reading."""
+        self.observe(time.perf_counter() - started)
+
+    def snapshot(self) -> dict:
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {"count": self.count, "p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None}
+
+        def pct(p: float) -> float:
+            idx = min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))
+            return round(ordered[idx] * 1000, 2)
+
+        return {
+            "count": self.count,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "p99_ms": pct(0.99),
+            "max_ms": round(ordered[-1] * 1000, 2),
+        }
+
+
+_counters: Dict[str, int] = {}
+_latencies: Dict[str, LatencyWindow] = {}
+
+
+def incr(name: str, n: int = 1):
+    _counters[name] = _counters.get(name, 0) + n
+
+
+def counter(name: str) -> int:
+    return _counters.get(name, 0)
+
+
+def latency(name: str) -> LatencyWindow:
+    window = _latencies.get(name)
+    if window is None:
+        window = _latencies[name] = LatencyWindow()
+    return window
+
+
+def latencies(prefix: str) -> dict:
+    """Snapshots of every latency window whose name starts with `prefix` (prefix stripped)."""
+    return {name[len(prefix):]: w.snapshot() for name, w in _latencies.items() if name.startswith(prefix)}
+
+
+def snapshot() -> dict:
+    return {
+        "counters": dict(_counters),
+        "latency": {name: w.snapshot() for name, w in _latencies.items()},
+    }
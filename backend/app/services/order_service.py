@@ -20,8 +20,7 @@ async def checkout_guard(session_id: uuid.UUID, db: AsyncSession) -> tuple[Cart,
     """Validate cart before creating an order. Raises CheckoutError on failure."""
 
     # 1. Session must be ACTIVE
-    sess_result = await db.execute(select(TableSession).where(TableSession.id == session_id))
-    session = sess_result.scalar_one_or_none()
+    session = await db.get(TableSession, session_id)
     if not session or session.status != SessionStatus.ACTIVE:
         raise CheckoutError("Session is not active")
 
@@ -38,8 +37,7 @@ async def checkout_guard(session_id: uuid.UUID, db: AsyncSession) -> tuple[Cart,
 
     # 3. All items must still be available
     for ci in items:
-        item_res = await db.execute(select(MenuItem).where(MenuItem.id == ci.menu_item_id))
-        menu_item = item_res.scalar_one_or_none()
+        menu_item = await db.get(MenuItem, ci.menu_item_id)
         if not menu_item:
             raise CheckoutError(f"Menu item {ci.menu_item_id} no longer exists")
         if not menu_item.is_available:
@@ -67,8 +65,7 @@ async def create_order_from_cart(
 ) -> Order:
     cart, items, cart_hash = await checkout_guard(session_id, db)
 
-    sess_result = await db.execute(select(TableSession).where(TableSession.id == session_id))
-    session = sess_result.scalar_one_or_none()
+    session = await db.get(TableSession, session_id)
     if not session:
         raise CheckoutError("Table session lost — please scan QR again")
 
@@ -103,8 +100,7 @@ async def create_order_from_cart(
             line_total=ci.line_total,
         )
         # Snapshot HSN code
-        item_res = await db.execute(select(MenuItem).where(MenuItem.id == ci.menu_item_id))
-        menu_item = item_res.scalar_one_or_none()
+        menu_item = await db.get(MenuItem, ci.menu_item_id)
         if menu_item:
             oi.hsn_code_snapshot = menu_item.hsn_code
         db.add(oi)
@@ -0,0 +1,193 @@
+"""Outbound reply dispatcher — per-number rate limiting, per-customer FIFO, retry and dead letters."""
+import asyncio
+import logging
+import random
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+
+import httpx
+
+from app.bot import tracing
+from app.bot.wa_sender import send_response, WhatsAppAPIError
+from app.config import settings
+from app.services import metrics
+from app.services.message_log_writer import message_log_writer
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class OutboundMessage:
+    restaurant_id: uuid.UUID
+    phone_number_id: str
+    access_token: str
+    to: str
+    response: dict          # bot final_response: {"type": "text|buttons|list", ...}
+    enqueued_at: float      # perf_counter when the inbound message was accepted
+    session_id: str | None = None
+    attempts: int = 0
+    trace: tracing.BotTrace | None = None
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Consume a token. Returns 0, or the seconds to wait before trying again."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    async def acquire(self):
+        while (wait := self.take()) > 0:
+            await asyncio.sleep(wait)
+
+
+class OutboundDispatcher:
+    """Queues replies so webhook handling never waits on Meta.
+
+    Each customer (phone_number_id, to) gets its own FIFO drained by one task, so
+    replies arrive in order and a retrying customer never blocks anyone else.
+    """
+
+    def __init__(self):
+        self._queues: dict[tuple[str, str], deque[OutboundMessage]] = {}
+        self._drainers: dict[tuple[str, str], asyncio.Task] = {}
+        self._buckets: dict[str, TokenBucket] = {}
+        self._sending = asyncio.Semaphore(settings.OUTBOUND_MAX_CONCURRENCY)
+        self.dead_letters: deque[dict] = deque(maxlen=settings.OUTBOUND_DEAD_LETTER_SIZE)
+        self.pending = 0
+
+    def enqueue(self, msg: OutboundMessage):
+        if self.pending >= settings.OUTBOUND_MAX_PENDING:
+            self._dead_letter(msg, "outbound queue full")
+            return
+        key = (msg.phone_number_id, msg.to)
+        self._queues.setdefault(key, deque()).append(msg)
+        self.pending += 1
+        metrics.incr("outbound.enqueued")
+        if key not in self._drainers:
+            self._drainers[key] = asyncio.create_task(self._drain(key))
+
+    async def _drain(self, key: tuple[str, str]):
+        queue = self._queues[key]
+        try:
+            while queue:
+                msg = queue[0]
+                try:
+                    await self._deliver(msg)
+                except Exception as e:
+                    # A bug outside the send itself (recording, a malformed reply) — lose this message, not the lane
+                    logger.exception(f"Unexpected error delivering reply to {msg.to}")
+                    try:
+                        self._dead_letter(msg, f"{type(e).__name__}: {e}")
+                    except Exception:
+                        metrics.incr("outbound.dead_lettered")
+                queue.popleft()
+                self.pending -= 1
+        finally:
+            # Idle customer — drop the lane (anything left over was cancelled at shutdown)
+            self.pending -= len(self._queues.pop(key, ()))
+            self._drainers.pop(key, None)
+
+    def _bucket(self, phone_number_id: str) -> TokenBucket:
+        bucket = self._buckets.get(phone_number_id)
+        if bucket is None:
+            bucket = self._buckets[phone_number_id] = TokenBucket(
+                settings.OUTBOUND_RATE_PER_SECOND, settings.OUTBOUND_BURST
+            )
+        return bucket
+
+    async def _deliver(self, msg: OutboundMessage):
+        """Send one message, retrying retryable failures with exponential backoff + full jitter."""
+        while True:
+            await self._bucket(msg.phone_number_id).acquire()
+            msg.attempts += 1
+            started = time.perf_counter()
+            try:
+                async with self._sending:
+                    resp = await send_response(msg.to, msg.response, msg.phone_number_id, msg.access_token)
+            except (WhatsAppAPIError, httpx.TransportError) as e:
+                retryable = isinstance(e, httpx.TransportError) or e.retryable
+                if not retryable or msg.attempts >= settings.OUTBOUND_MAX_ATTEMPTS:
+                    self._dead_letter(msg, str(e))
+                    return
+                metrics.incr("outbound.retries")
+                delay = random.uniform(0, min(
+                    settings.OUTBOUND_BACKOFF_MAX_SECONDS,
+                    settings.OUTBOUND_BACKOFF_BASE_SECONDS * 2 ** (msg.attempts - 1),
+                ))
+                logger.warning(f"Retrying reply to {msg.to} in {delay:.2f}s (attempt {msg.attempts}): {e}")
+                await asyncio.sleep(delay)
+                continue
+            except Exception as e:
+                logger.exception(f"Failed to send WhatsApp message to {msg.to}")
+                self._dead_letter(msg, str(e))
+                return
+
+            metrics.latency("outbound.send").since(started)
+            if msg.trace is not None:
+                tracing.record_send(msg.trace, time.perf_counter() - started, msg.attempts, "sent")
+            metrics.latency("webhook.enqueue_to_reply").since(msg.enqueued_at)
+            metrics.incr("outbound.sent")
+            logger.info(f"WhatsApp API response: {resp}")
+            self._record(msg, resp)
+            return
+
+    def _record(self, msg: OutboundMessage, resp: dict):
+        """Audit row for the sent reply; delivery status callbacks join on the Meta message id."""
+        for sent in resp.get("messages") or []:
+            message_log_writer.add_outbound(
+                restaurant_id=msg.restaurant_id,
+                wa_message_id=sent.get("id", ""),
+                message_type="text" if msg.response.get("type", "text") == "text" else "interactive",
+                payload=msg.response,
+                session_id=msg.session_id,
+            )
+
+    def _dead_letter(self, msg: OutboundMessage, error: str):
+        metrics.incr("outbound.dead_lettered")
+        logger.error(f"Dead-lettered reply to {msg.to} after {msg.attempts} attempts: {error}")
+        if msg.trace is not None:
+            tracing.record_send(msg.trace, None, msg.attempts, "dead_lettered")
+        self.dead_letters.append({
+            "restaurant_id": str(msg.restaurant_id),
+            "phone_number_id": msg.phone_number_id,
+            "to": msg.to,
+            "type": msg.response.get("type", "text"),
+            "attempts": msg.attempts,
+            "error": error,
+            "at": time.time(),
+        })
+
+    async def stop(self, grace_seconds: float = 10.0):
+        """Give queued replies up to `grace_seconds` to go out, then cancel the rest."""
+        tasks = list(self._drainers.values())
+        if not tasks:
+            return
+        _, still_running = await asyncio.wait(tasks, timeout=grace_seconds)
+        for task in still_running:
+            task.cancel()
+        if still_running:
+            logger.warning(f"Outbound dispatcher stopped with {self.pending} replies unsent")
+            await asyncio.gather(*still_running, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending,
+            "active_customers": len(self._drainers),
+            "dead_letters": len(self.dead_letters),
+        }
+
+
+dispatcher = OutboundDispatcher()
@@ -0,0 +1,43 @@
+"""Shared Redis client for the optional cache tiers — lazily connected, fails open."""
+import logging
+import time
+
+from app.config import settings
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+_client = None
+_down_until = 0.0
+
+
+def get_redis():
+    """The shared `redis.asyncio` client, or None while Redis is marked down."""
+    global _client
+    if time.monotonic() < _down_until:
+        return None
+    if _client is None:
+        import redis.asyncio as aioredis
+
+        _client = aioredis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        )
+    return _client
+
+
+def mark_down(error: Exception):
+    """Stop using Redis for REDIS_RETRY_SECONDS — callers fall back to their local tier."""
+    global _down_until
+    metrics.incr("redis.errors")
+    if time.monotonic() >= _down_until:
+        logger.warning(f"Redis unavailable, using local caches for {settings.REDIS_RETRY_SECONDS:.0f}s: {error}")
+    _down_until = time.monotonic() + settings.REDIS_RETRY_SECONDS
+
+
+async def close_redis():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
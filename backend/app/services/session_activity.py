@@ -0,0 +1,83 @@
+"""Session activity — last_message_at tracked in memory, written to table_sessions in batches."""
+import logging
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+
+from sqlalchemy import update
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.customers import TableSession
+from app.services import metrics
+from app.services.batching import BatchFlusher
+
+logger = logging.getLogger(__name__)
+
+
+class SessionActivity(BatchFlusher):
+    """Coalesces per-message session touches into one bulk UPDATE per flush.
+
+    The inactivity timeout reads `last_seen`, which prefers the in-memory
+    timestamp over the (possibly lagging) persisted column.
+    """
+
+    name = "session_activity"
+
+    def __init__(self, max_rows: int, interval_ms: int, max_tracked: int):
+        super().__init__(max_rows, interval_ms)
+        self.max_tracked = max_tracked
+        self._seen: OrderedDict[uuid.UUID, datetime] = OrderedDict()  # LRU of recent activity
+        self._dirty: dict[uuid.UUID, datetime] = {}                    # not yet flushed
+
+    def touch(self, session_id: uuid.UUID, at: datetime):
+        metrics.incr("session_activity.touches")
+        if session_id in self._dirty:
+            metrics.incr("session_activity.coalesced")
+        self._dirty[session_id] = at
+        self._seen[session_id] = at
+        self._seen.move_to_end(session_id)
+        if len(self._seen) > self.max_tracked:
+            # Safe to forget: the persisted column (or _dirty) still has the value
+            self._seen.popitem(last=False)
+        self._notify()
+
+    def last_seen(self, session_id: uuid.UUID, persisted: datetime) -> datetime:
+        """The newest of the persisted column and any in-memory touch (never older than `persisted`)."""
+        tracked = [t for t in (self._seen.get(session_id), self._dirty.get(session_id)) if t]
+        return max([persisted, *tracked])
+
+    def forget(self, session_id: uuid.UUID):
+        """Session closed — stop tracking it and drop any unflushed touch."""
+        self._seen.pop(session_id, None)
+        self._dirty.pop(session_id, None)
+
+    def pending(self) -> int:
+        return len(self._dirty)
+
+    def _drain(self) -> dict[uuid.UUID, datetime]:
+        batch, self._dirty = self._dirty, {}
+        return batch
+
+    def _restore(self, batch: dict[uuid.UUID, datetime]):
+        # Newer touches that arrived during the failed flush win
+        for session_id, at in batch.items():
+            if session_id not in self._dirty:
+                self._dirty[session_id] = at
+
+    async def _write(self, batch: dict[uuid.UUID, datetime]) -> int:
+        async with AsyncSessionLocal() as db:
+            # ORM bulk UPDATE by primary key — one executemany for the whole batch
+            await db.execute(
+                update(TableSession),
+                [{"id": session_id, "last_message_at": at} for session_id, at in batch.items()],
+            )
+            await db.commit()
+        return len(batch)
+
+
+session_activity = SessionActivity(
+    max_rows=settings.SESSION_ACTIVITY_FLUSH_MAX_ROWS,
+    interval_ms=settings.SESSION_ACTIVITY_FLUSH_INTERVAL_MS,
+    max_tracked=settings.SESSION_ACTIVITY_MAX_TRACKED,
+)
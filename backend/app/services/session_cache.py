@@ -0,0 +1,184 @@
+"""Active session cache — a diner's open TableSession context keyed by (restaurant_id, wa_user_id)."""
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+
+import orjson
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.services import metrics
+from app.services.redis_client import get_redis, mark_down
+from app.services.session_activity import session_activity
+
+logger = logging.getLogger(__name__)
+
+# Same rule resolve_session enforces against the database
+IDLE_LIMIT_SECONDS = 2 * 3600
+
+
+@dataclass(frozen=True, slots=True)
+class SessionContext:
+    session_id: str
+    customer_id: str
+    branch_id: str
+    table_id: str
+    preferred_language: str
+    last_message_at: float  # epoch seconds when the context was cached
+
+
+class SessionCache:
+    """Local LRU in front of an optional Redis tier shared by all workers.
+
+    A reverse index session_id → key lets pay_bill and QR re-pairing invalidate
+    by session id. Entries past the 2-hour inactivity limit are never returned,
+    so the caller falls back to the database path, which closes the session.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, local_ttl_seconds: float, use_redis: bool):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.use_redis = use_redis
+        # With Redis on, other workers may invalidate — keep the local copy short-lived
+        self.local_ttl = local_ttl_seconds if use_redis else ttl_seconds
+        self._entries: OrderedDict[str, tuple[SessionContext, float]] = OrderedDict()  # key -> (ctx, cached_at)
+        self._by_session: dict[str, str] = {}
+
+    @staticmethod
+    def _key(restaurant_id: str, wa_user_id: str) -> str:
+        return f"{restaurant_id}:{wa_user_id}"
+
+    # ─── Local tier ─────────────────────────────────────────────
+
+    def _local_put(self, key: str, ctx: SessionContext):
+        self._local_drop(key)
+        self._entries[key] = (ctx, time.monotonic())
+        self._by_session[ctx.session_id] = key
+        if len(self._entries) > self.max_entries:
+            old_key, (old_ctx, _) = self._entries.popitem(last=False)
+            self._by_session.pop(old_ctx.session_id, None)
+
+    def _local_drop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None and self._by_session.get(entry[0].session_id) == key:
+            del self._by_session[entry[0].session_id]
+
+    def _local_get(self, key: str) -> SessionContext | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        ctx, cached_at = entry
+        if time.monotonic() - cached_at >= self.local_ttl:
+            self._local_drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return ctx
+
+    # ─── Public API ─────────────────────────────────────────────
+
+    async def get(self, restaurant_id: str, wa_user_id: str) -> SessionContext | None:
+        key = self._key(restaurant_id, wa_user_id)
+        ctx = self._local_get(key)
+        if ctx is None and self.use_redis:
+            ctx = await self._redis_get(key)
+            if ctx is not None:
+                self._local_put(key, ctx)
+        if ctx is None:
+            metrics.incr("session_cache.misses")
+            return None
+        if self._idle_seconds(ctx) > IDLE_LIMIT_SECONDS:
+            metrics.incr("session_cache.expired")
+            await self.invalidate_session(ctx.session_id)
+            return None
+        metrics.incr("session_cache.hits")
+        return ctx
+
+    def peek(self, restaurant_id: str, wa_user_id: str) -> SessionContext | None:
+        """Local tier only, not counted, never invalidates: a guess at the session for work started early."""
+        ctx = self._local_get(self._key(restaurant_id, wa_user_id))
+        if ctx is None or self._idle_seconds(ctx) > IDLE_LIMIT_SECONDS:
+            return None
+        return ctx
+
+    async def put(
+        self,
+        restaurant_id: str,
+        wa_user_id: str,
+        session_id: str,
+        customer_id: str,
+        branch_id: str,
+        table_id: str,
+        preferred_language,
+        last_message_at: datetime | None = None,
+    ) -> SessionContext:
+        ctx = SessionContext(
+            session_id=session_id,
+            customer_id=customer_id,
+            branch_id=branch_id,
+            table_id=table_id,
+            preferred_language=getattr(preferred_language, "value", preferred_language) or "en",
+            last_message_at=(last_message_at or datetime.now(timezone.utc)).timestamp(),
+        )
+        key = self._key(restaurant_id, wa_user_id)
+        self._local_put(key, ctx)
+        if self.use_redis and (r := get_redis()) is not None:
+            try:
+                async with r.pipeline(transaction=False) as pipe:
+                    pipe.set(f"hd:sess:{key}", orjson.dumps(asdict(ctx)), ex=int(self.ttl_seconds))
+                    pipe.set(f"hd:sess_idx:{session_id}", key, ex=int(self.ttl_seconds))
+                    await pipe.execute()
+            except RedisError as e:
+                mark_down(e)
+        return ctx
+
+    async def invalidate_session(self, session_id: str | uuid.UUID):
+        """Drop the context of a closed / replaced session, locally and in Redis."""
+        session_id = str(session_id)
+        key = self._by_session.get(session_id)
+        if key is not None:
+            self._local_drop(key)
+        if self.use_redis and (r := get_redis()) is not None:
+            try:
+                redis_key = await r.getdel(f"hd:sess_idx:{session_id}")
+                if redis_key is not None:
+                    redis_key = redis_key.decode()
+                    # Only delete the entry if it still points at this session
+                    raw = await r.get(f"hd:sess:{redis_key}")
+                    if raw is not None and orjson.loads(raw).get("session_id") == session_id:
+                        await r.delete(f"hd:sess:{redis_key}")
+            except RedisError as e:
+                mark_down(e)
+        metrics.incr("session_cache.invalidations")
+
+    def _idle_seconds(self, ctx: SessionContext) -> float:
+        cached = datetime.fromtimestamp(ctx.last_message_at, timezone.utc)
+        last = session_activity.last_seen(uuid.UUID(ctx.session_id), cached)
+        return (datetime.now(timezone.utc) - last).total_seconds()
+
+    async def _redis_get(self, key: str) -> SessionContext | None:
+        r = get_redis()
+        if r is None:
+            return None
+        try:
+            raw = await r.get(f"hd:sess:{key}")
+        except RedisError as e:
+            mark_down(e)
+            return None
+        if raw is None:
+            return None
+        metrics.incr("session_cache.redis_hits")
+        return SessionContext(**orjson.loads(raw))
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "redis": self.use_redis}
+
+
+session_cache = SessionCache(
+    max_entries=settings.SESSION_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.SESSION_CACHE_TTL_SECONDS,
+    local_ttl_seconds=settings.SESSION_CACHE_LOCAL_TTL_SECONDS,
+    use_redis=settings.SESSION_CACHE_REDIS,
+)
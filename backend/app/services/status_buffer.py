@@ -0,0 +1,118 @@
+"""Delivery status ingestion — coalesce WhatsApp status callbacks into batched UPDATEs."""
+import logging
+
+from sqlalchemy import select, update, or_
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.logs import WhatsAppMessageLog, DeliveryStatus
+from app.services import metrics
+from app.services.batching import BatchFlusher
+
+logger = logging.getLogger(__name__)
+
+# Meta can deliver callbacks out of order; a message only ever moves forward
+_RANK = {
+    DeliveryStatus.SENT: 1,
+    DeliveryStatus.DELIVERED: 2,
+    DeliveryStatus.READ: 3,
+    DeliveryStatus.FAILED: 4,
+}
+_WA_STATUS = {
+    "sent": DeliveryStatus.SENT,
+    "delivered": DeliveryStatus.DELIVERED,
+    "read": DeliveryStatus.READ,
+    "failed": DeliveryStatus.FAILED,
+}
+
+
+class StatusBuffer(BatchFlusher):
+    """Keeps only the latest status per wa_message_id until the next flush."""
+
+    name = "status_buffer"
+
+    def __init__(self, max_rows: int, interval_ms: int, max_attempts: int):
+        super().__init__(max_rows, interval_ms)
+        self.max_attempts = max_attempts
+        # wa_message_id -> (status, flush attempts so far)
+        self._latest: dict[str, tuple[DeliveryStatus, int]] = {}
+
+    def add(self, wa_message_id: str, wa_status: str, attempts: int = 0):
+        status = _WA_STATUS.get((wa_status or "").lower())
+        if not wa_message_id or status is None:
+            return
+        metrics.incr("status_buffer.received")
+        current = self._latest.get(wa_message_id)
+        if current is None or _RANK[status] >= _RANK[current[0]]:
+            self._latest[wa_message_id] = (status, attempts)
+        else:
+            metrics.incr("status_buffer.coalesced")
+        self._notify()
+
+    def pending(self) -> int:
+        return len(self._latest)
+
+    def _drain(self) -> dict[str, tuple[DeliveryStatus, int]]:
+        batch, self._latest = self._latest, {}
+        return batch
+
+    def _restore(self, batch: dict[str, tuple[DeliveryStatus, int]]):
+        for wa_message_id, (status, attempts) in batch.items():
+            self._merge(wa_message_id, status, attempts + 1)
+
+    def _merge(self, wa_message_id: str, status: DeliveryStatus, attempts: int):
+        if attempts >= self.max_attempts:
+            metrics.incr("status_buffer.dropped")
+            return
+        current = self._latest.get(wa_message_id)
+        if current is None or _RANK[status] > _RANK[current[0]]:
+            self._latest[wa_message_id] = (status, attempts)
+
+    async def _write(self, batch: dict[str, tuple[DeliveryStatus, int]]) -> int:
+        by_status: dict[DeliveryStatus, list[str]] = {}
+        for wa_message_id, (status, _) in batch.items():
+            by_status.setdefault(status, []).append(wa_message_id)
+
+        matched: set[str] = set()
+        async with AsyncSessionLocal() as db:
+            # One UPDATE per status value (at most four) in a single transaction
+            for status, ids in by_status.items():
+                lower = [s for s, rank in _RANK.items() if rank < _RANK[status]]
+                result = await db.execute(
+                    update(WhatsAppMessageLog)
+                    .where(
+                        WhatsAppMessageLog.wa_message_id.in_(ids),
+                        or_(WhatsAppMessageLog.delivery_status.is_(None), WhatsAppMessageLog.delivery_status.in_(lower)),
+                    )
+                    .values(delivery_status=status)
+                    .returning(WhatsAppMessageLog.wa_message_id)
+                    .execution_options(synchronize_session=False)
+                )
+                matched.update(result.scalars().all())
+            await db.commit()
+
+            # Unmatched ids are either already at this status or later (duplicate / late callbacks)
+            # or have no log row yet. Only the missing rows are worth another try
+            unmatched = [i for i in batch if i not in matched]
+            existing: set[str] = set()
+            if unmatched:
+                result = await db.execute(
+                    select(WhatsAppMessageLog.wa_message_id).where(WhatsAppMessageLog.wa_message_id.in_(unmatched))
+                )
+                existing.update(result.scalars().all())
+
+        # The outbound log row may not be written yet — retry those ids on a later flush
+        for wa_message_id in unmatched:
+            if wa_message_id in existing:
+                metrics.incr("status_buffer.stale")
+            else:
+                status, attempts = batch[wa_message_id]
+                self._merge(wa_message_id, status, attempts + 1)
+        return len(matched)
+
+
+status_buffer = StatusBuffer(
+    max_rows=settings.STATUS_FLUSH_MAX_ROWS,
+    interval_ms=settings.STATUS_FLUSH_INTERVAL_MS,
+    max_attempts=settings.STATUS_FLUSH_MAX_ATTEMPTS,
+)
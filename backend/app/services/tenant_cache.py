@@ -0,0 +1,87 @@
+"""Tenant routing cache — restaurant WhatsApp credentials keyed by id and by phone_number_id."""
+import time
+import uuid
+from dataclasses import dataclass
+
+from sqlalchemy import select
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.tenancy import Restaurant
+from app.services import metrics
+
+
+@dataclass(frozen=True, slots=True)
+class Tenant:
+    id: uuid.UUID
+    name: str
+    phone_number_id: str
+    display_number: str
+    access_token: str | None
+    app_secret: str | None
+    verify_token: str
+    loaded_at: float
+
+
+class TenantCache:
+    """In-process copy of the Restaurant fields the webhook needs, with a TTL."""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._by_id: dict[uuid.UUID, Tenant] = {}
+        self._by_phone: dict[str, Tenant] = {}
+
+    def _fresh(self, tenant: Tenant | None) -> bool:
+        return tenant is not None and time.monotonic() - tenant.loaded_at < self.ttl_seconds
+
+    def put(self, restaurant: Restaurant) -> Tenant:
+        self.invalidate(restaurant.id)
+        tenant = Tenant(
+            id=restaurant.id,
+            name=restaurant.name,
+            phone_number_id=restaurant.whatsapp_phone_number_id,
+            display_number=restaurant.whatsapp_display_number,
+            access_token=restaurant.whatsapp_access_token,
+            app_secret=restaurant.whatsapp_app_secret,
+            verify_token=restaurant.whatsapp_verify_token,
+            loaded_at=time.monotonic(),
+        )
+        self._by_id[tenant.id] = tenant
+        self._by_phone[tenant.phone_number_id] = tenant
+        return tenant
+
+    def invalidate(self, restaurant_id: uuid.UUID):
+        tenant = self._by_id.pop(restaurant_id, None)
+        if tenant and self._by_phone.get(tenant.phone_number_id) is tenant:
+            del self._by_phone[tenant.phone_number_id]
+
+    def clear(self):
+        self._by_id.clear()
+        self._by_phone.clear()
+
+    async def get(self, restaurant_id: uuid.UUID) -> Tenant | None:
+        tenant = self._by_id.get(restaurant_id)
+        if self._fresh(tenant):
+            metrics.incr("tenant_cache.hits")
+            return tenant
+        metrics.incr("tenant_cache.misses")
+        return await self._load(Restaurant.id == restaurant_id)
+
+    async def get_by_phone_number_id(self, phone_number_id: str) -> Tenant | None:
+        tenant = self._by_phone.get(phone_number_id)
+        if self._fresh(tenant):
+            metrics.incr("tenant_cache.hits")
+            return tenant
+        metrics.incr("tenant_cache.misses")
+        return await self._load(Restaurant.whatsapp_phone_number_id == phone_number_id)
+
+    async def _load(self, condition) -> Tenant | None:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(Restaurant).where(condition))
+            restaurant = result.scalar_one_or_none()
+        if not restaurant:
+            return None
+        return self.put(restaurant)
+
+
+tenant_cache = TenantCache(ttl_seconds=settings.TENANT_CACHE_TTL_SECONDS)
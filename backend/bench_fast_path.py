@@ -0,0 +1,109 @@
+"""Benchmark: interactive replies through the compiled LangGraph vs the fast-path dispatcher.
+
+DB-backed nodes are replaced by stubs so only the orchestration cost is measured;
+ingest_webhook, detect_language, intent_router and response_formatter are the real ones.
+
+    python bench_fast_path.py [iterations]
+"""
+import asyncio
+import os
+import sys
+import time
+import uuid
+
+os.environ.setdefault("GEMINI_API_KEY", "bench")  # the LLM clients are built at import time
+
+from app.bot.payload import InboundMessage
+from app.bot.graph import NODES, build_graph
+from app.bot.fast_path import FastPath
+from app.bot.state import BotState
+
+ITEM_ID = str(uuid.uuid4())
+PAYLOAD_IDS = ["view_cart", "confirm_order", "do_confirm", "show_menu", f"item_{ITEM_ID}", f"qty_2_{ITEM_ID}", f"cat_{ITEM_ID}"]
+
+
+async def _stub_session(state, config=None):
+    state["session_id"] = "00000000-0000-0000-0000-000000000001"
+    state["branch_id"] = "00000000-0000-0000-0000-000000000002"
+    state["preferred_language"] = "en"
+    return state
+
+
+async def _stub_action(state, config=None):
+    state["final_response"] = {"type": "text", "body": f"ok {state.get('intent')}"}
+    return state
+
+
+STUBS = {
+    name: _stub_session if name == "resolve_session" else _stub_action
+    for name in ("resolve_session", "menu_retrieval", "item_info", "cart_executor", "checkout_guard",
+                 "kitchen_dispatch", "bill_generator", "restaurant_chat")
+}
+
+
+def _inbound(payload_id: str, n: int) -> InboundMessage:
+    return InboundMessage(
+        wa_message_id=f"wamid.bench{n}",
+        wa_user_id="919000000000",
+        phone_number_id="100000000000000",
+        message_type="interactive",
+        text=payload_id,
+        raw={"type": "interactive"},
+    )
+
+
+def _state(inbound: InboundMessage) -> BotState:
+    return {"inbound": inbound, "restaurant_id": "00000000-0000-0000-0000-000000000003"}
+
+
+def _pct(samples: list[float], p: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))] * 1000
+
+
+async def _bench(label: str, run, iterations: int):
+    for i in range(200):  # warm-up
+        await run(PAYLOAD_IDS[i % len(PAYLOAD_IDS)], i)
+    samples = []
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for i in range(iterations):
+        started = time.perf_counter()
+        await run(PAYLOAD_IDS[i % len(PAYLOAD_IDS)], i)
+        samples.append(time.perf_counter() - started)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    print(
+        f"{label:<10} p50 {_pct(samples, 0.5):7.3f} ms   p99 {_pct(samples, 0.99):7.3f} ms   "
+        f"CPU/msg {cpu / iterations * 1e6:8.1f} µs   throughput {iterations / wall:8.0f} msg/s"
+    )
+    return cpu
+
+
+async def main(iterations: int):
+    nodes = {**NODES, **STUBS}
+    graph = build_graph(nodes)
+    fast = FastPath(nodes)
+
+    async def via_graph(payload_id: str, n: int):
+        return await graph.ainvoke(_state(_inbound(payload_id, n)))
+
+    async def via_fast_path(payload_id: str, n: int):
+        inbound = _inbound(payload_id, n)
+        route = fast.route(inbound)
+        assert route is not None, payload_id  # every PAYLOAD_ID is an interactive reply
+        return await fast.run(_state(inbound), route)
+
+    # Same answer either way
+    for i, pid in enumerate(PAYLOAD_IDS):
+        a, b = await via_graph(pid, i), await via_fast_path(pid, i)
+        assert (a.get("intent"), a.get("final_response")) == (b.get("intent"), b.get("final_response")), pid
+
+    print(f"{iterations} interactive replies, {len(PAYLOAD_IDS)} payload kinds round-robin\n")
+    graph_cpu = await _bench("graph", via_graph, iterations)
+    fast_cpu = await _bench("fast path", via_fast_path, iterations)
+    print(f"\nCPU saved per message: {(graph_cpu - fast_cpu) / iterations * 1e6:.1f} µs ({graph_cpu / fast_cpu:.1f}x)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
@@ -0,0 +1,109 @@
+"""Offline check of FAQ matching on a sample restaurant's FAQs.
+
+Every labelled query is matched against the index. Any query that should go to
+Gemini but matches an FAQ at FAQ_MATCH_THRESHOLD is a false positive: the bot
+would send an unrelated canned answer. The script lists them and exits 1.
+It also prints precision / recall over a range of thresholds for re-tuning.
+
+    python eval_faq_match.py [--threshold 0.55]
+"""
+import argparse
+import os
+import sys
+
+os.environ.setdefault("GEMINI_API_KEY", "eval")  # the LLM clients are built at import time
+
+from app.bot.faq_store import FAQIndex
+from app.config import settings
+
+FAQS = {
+    "timings": "what are your timings\nwhen do you open\nwhat time do you close\nopening hours",
+    "parking": "is parking available\ndo you have parking\nvalet parking",
+    "wifi": "do you have wifi\nwhat is the wifi password",
+    "location": "where are you located\nwhat is your address\nhow to reach you",
+    "payment": "do you accept cards\ncan i pay by upi\npayment options",
+    "delivery": "do you deliver\nis home delivery available",
+    "birthday": "can we celebrate a birthday here\ncan we bring our own cake",
+    "pets": "are pets allowed\ncan i bring my dog",
+}
+
+# (query, FAQ it should answer, or None when it must go to Gemini)
+QUERIES = [
+    ("what are ur timings", "timings"),
+    ("timmings?", "timings"),
+    ("when do u open", "timings"),
+    ("what time do you open", "timings"),
+    ("opening hours today", "timings"),
+    ("is there parking", "parking"),
+    ("parkng", "parking"),
+    ("parking available?", "parking"),
+    ("valet?", "parking"),
+    ("wifi password", "wifi"),
+    ("do you guys have wifi", "wifi"),
+    ("where is the restaurant located", "location"),
+    ("address pls", "location"),
+    ("can i pay with upi", "payment"),
+    ("do you take cards", "payment"),
+    ("home delivery?", "delivery"),
+    ("do you do home delivery", "delivery"),
+    ("can i bring a cake", "birthday"),
+    ("birthday celebration", "birthday"),
+    ("are dogs allowed", "pets"),
+    ("is table available", None),
+    ("is paneer available", None),
+    ("is biryani available today", None),
+    ("do you have paneer tikka", None),
+    ("add 2 butter naan", None),
+    ("i want veg biryani", None),
+    ("can i get the bill", None),
+    ("what time will my order come", None),
+    ("is the soup spicy", None),
+    ("what is in the thali", None),
+    ("do you have jain food", None),
+    ("can i pay later", None),
+    ("is it open on diwali", None),
+    ("hi", None),
+    ("thank you", None),
+]
+
+
+def _index() -> FAQIndex:
+    index = FAQIndex(loaded_at=0.0)
+    for faq_id, question in FAQS.items():
+        index.add(faq_id, None, question, f"<{faq_id} answer>")
+    return index
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--threshold", type=float, default=settings.FAQ_MATCH_THRESHOLD)
+    args = ap.parse_args()
+
+    index = _index()
+    results = []
+    for query, expected in QUERIES:
+        found = index.best(query, None)
+        results.append((query, expected, found.faq_id if found else None, found.score if found else 0.0))
+
+    print(f"{'query':<34} {'expected':<10} {'matched':<10} score")
+    for query, expected, got, score in results:
+        print(f"{query:<34} {expected or '-':<10} {got or '-':<10} {score:.3f}")
+
+    print(f"\n{'threshold':>9} {'precision':>9} {'recall':>7} {'false+':>6}")
+    for t in [x / 100 for x in range(30, 85, 5)]:
+        answered = [(e, g) for _, e, g, s in results if g is not None and s >= t]
+        correct = sum(1 for e, g in answered if e == g)
+        wanted = sum(1 for _, e, _, _ in results if e is not None)
+        print(f"{t:>9.2f} {correct / len(answered) if answered else 1.0:>9.3f} {correct / wanted:>7.3f} {len(answered) - correct:>6}")
+
+    wrong = [(q, e, g, s) for q, e, g, s in results if g is not None and s >= args.threshold and g != e]
+    if wrong:
+        print(f"\n❌ {len(wrong)} wrong answer(s) at threshold {args.threshold}:")
+        for q, e, g, s in wrong:
+            print(f"   {q!r}: answered with {g} ({s:.3f}), expected {e or 'Gemini'}")
+        sys.exit(1)
+    print(f"\n✅ No wrong answers at threshold {args.threshold}")
+
+
+if __name__ == "__main__":
+    main()
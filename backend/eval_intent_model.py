@@ -0,0 +1,94 @@
+"""Offline evaluation of the local intent classifier on a labelled corpus.
+
+Stratified k-fold cross-validation: for each fold a model is trained on the rest
+and scored on the held-out messages. Reports accuracy, accuracy / coverage at the
+confidence threshold (coverage = Gemini calls avoided), the keyword-shortcut
+baseline on the same messages, per-intent recall and prediction latency.
+
+    python eval_intent_model.py [corpus.jsonl ...] [--folds 5] [--threshold 0.8]
+"""
+import argparse
+import os
+import random
+import time
+from collections import Counter, defaultdict
+
+os.environ.setdefault("GEMINI_API_KEY", "eval")  # the LLM clients are built at import time
+
+from app.bot.intent_classifier import IntentClassifier, extract_entities, load_samples
+from app.bot.nodes.intent import keyword_shortcut
+
+
+def _folds(samples: list[tuple[str, str]], k: int, seed: int = 13) -> list[list[tuple[str, str]]]:
+    by_label = defaultdict(list)
+    for s in samples:
+        by_label[s[1]].append(s)
+    folds = [[] for _ in range(k)]
+    rng = random.Random(seed)
+    for rows in by_label.values():
+        rng.shuffle(rows)
+        for i, row in enumerate(rows):
+            folds[i % k].append(row)
+    return folds
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("paths", nargs="*", default=["app/bot/data/intent_corpus.jsonl"])
+    ap.add_argument("--folds", type=int, default=5)
+    ap.add_argument("--threshold", type=float, default=0.8)
+    args = ap.parse_args()
+
+    samples = load_samples(args.paths)
+    folds = _folds(samples, args.folds)
+    total = correct = confident = confident_correct = 0
+    kw_covered = kw_correct = 0
+    recall = Counter()
+    support = Counter()
+    confusions = Counter()
+    latencies = []
+
+    for i, held_out in enumerate(folds):
+        train = [s for j, fold in enumerate(folds) if j != i for s in fold]
+        model = IntentClassifier.train(train)
+        for text, label in held_out:
+            started = time.perf_counter()
+            intent, p = model.predict(text)
+            latencies.append(time.perf_counter() - started)
+            total += 1
+            support[label] += 1
+            if intent == label:
+                correct += 1
+                recall[label] += 1
+            else:
+                confusions[(label, intent)] += 1
+            # Same rule intent_router applies: confident and entities readable
+            if p >= args.threshold and extract_entities(intent, text) is not None:
+                confident += 1
+                confident_correct += intent == label
+
+            kw = keyword_shortcut(text)
+            if kw is not None:
+                kw_covered += 1
+                kw_correct += kw[0] == label
+
+    latencies.sort()
+    print(f"{len(samples)} labelled messages, {args.folds}-fold cross-validation\n")
+    print(f"classifier accuracy (all):          {correct / total:6.1%}")
+    print(f"resolved locally at p >= {args.threshold:.2f}:      {confident / total:6.1%}  (Gemini calls avoided)")
+    print(f"  accuracy of those:                {confident_correct / max(confident, 1):6.1%}")
+    print(f"keyword shortcuts resolved:         {kw_covered / total:6.1%}")
+    print(f"  accuracy of those:                {kw_correct / max(kw_covered, 1):6.1%}")
+    print(f"predict latency p50 / p99:          {latencies[len(latencies) // 2] * 1e6:.0f} µs / "
+          f"{latencies[int(len(latencies) * 0.99)] * 1e6:.0f} µs")
+    print("\nper-intent recall:")
+    for label in sorted(support):
+        print(f"  {label:<16} {recall[label] / support[label]:6.1%}  ({support[label]})")
+    if confusions:
+        print("\nmost common confusions (expected → predicted):")
+        for (label, intent), n in confusions.most_common(8):
+            print(f"  {label} → {intent}: {n}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+"""Create the restaurant_faqs table (RestaurantFAQ) on an existing database."""
+import asyncio
+import sys
+import os
+from typing import cast
+sys.path.insert(0, os.path.dirname(__file__))
+
+from sqlalchemy import Table
+from app.database import engine
+import app.models  # restaurants / branches must be registered for the foreign keys
+from app.models.faq import RestaurantFAQ
+
+async def migrate():
+    async with engine.begin() as conn:
+        print("Creating restaurant_faqs table...")
+        try:
+            table = cast(Table, RestaurantFAQ.__table__)
+            await conn.run_sync(lambda sync_conn: table.create(sync_conn, checkfirst=True))
+            print("✅ Table ready!")
+        except Exception as e:
+            print(f"❌ Migration failed: {e}")
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
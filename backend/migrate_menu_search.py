@@ -0,0 +1,34 @@
+"""Enable pg_trgm and build the menu search indexes (ix_menu_items_*) on an existing database.
+
+Indexes are built CONCURRENTLY so a live branch menu isn't locked while they build.
+"""
+import asyncio
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.database import engine
+from sqlalchemy import text
+
+STATEMENTS = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_menu_items_branch_id ON menu_items (branch_id)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_menu_items_name_trgm ON menu_items USING gin (name gin_trgm_ops)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_menu_items_description_trgm ON menu_items USING gin (description gin_trgm_ops)",
+]
+
+async def migrate():
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction block
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for stmt in STATEMENTS:
+            print(f"{stmt} ...")
+            try:
+                await conn.execute(text(stmt))
+            except Exception as e:
+                print(f"❌ Migration failed: {e}")
+                return
+    print("✅ Menu search indexes ready!")
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
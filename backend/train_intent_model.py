@@ -0,0 +1,26 @@
+"""Train the local intent classifier (app/bot/data/intent_model.json).
+
+Inputs are JSONL files of {"text": ..., "intent": ...} rows. Application logs
+work too: lines containing `intent.label {...}` (written by intent_router for
+every Gemini-resolved message) are picked out and used as extra samples.
+
+    python train_intent_model.py app/bot/data/intent_corpus.jsonl [more.jsonl | app.log ...]
+"""
+import sys
+import time
+
+from app.bot.intent_classifier import IntentClassifier, DEFAULT_MODEL_PATH, load_samples
+
+
+def main(paths: list[str]):
+    samples = load_samples(paths)
+    if not samples:
+        sys.exit("No labelled samples found")
+    started = time.perf_counter()
+    model = IntentClassifier.train(samples)
+    model.save(DEFAULT_MODEL_PATH)
+    print(f"Trained on {len(samples)} samples in {time.perf_counter() - started:.1f}s → {DEFAULT_MODEL_PATH}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or ["app/bot/data/intent_corpus.jsonl"])